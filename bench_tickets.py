@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Alyssa's Ticket Maker
+Times PDF generation (create_pdf, create_blanks_pdf) and the GUI preview renders on
+synthetic attendee lists and ticket images, and compares the results to a baseline.
+
+Every case runs in a fresh process, so the peak memory reported is that case's own.
+Parallel (sharded) runs must come out within a few percent of the serial file size.
+Preview cases need Tk and a display (and ttkbootstrap); without them they are skipped.
+
+Usage:
+    python bench_tickets.py                                  # run everything
+    python bench_tickets.py --quick --only "pdf/*"           # skip the 1M-row cases
+    python bench_tickets.py --save-baseline bench_baseline.json
+    python bench_tickets.py --baseline bench_baseline.json   # exit 1 on regressions
+    python bench_tickets.py --quick --only "pdf/10000/grid*"  # parallel vs serial file size
+"""
+
+import argparse
+import csv
+import fnmatch
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw
+
+from ticket_engine import TicketRenderer, TicketSettings
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False  # Windows
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+BASELINE_VERSION = 1
+ROW_COUNTS = (100, 10_000, 1_000_000)
+QUICK_ROW_COUNTS = (100, 10_000)
+MATRIX_MAX_ROWS = 10_000  # Bigger lists only run the plain and the heaviest option set
+BLANK_PAGES = (1, 100)
+PARALLEL_WORKERS = 4
+PARALLEL_MIN_ROWS = 10_000  # Smaller lists aren't sharded
+PARALLEL_SIZE_TOLERANCE = 0.03  # Merged shards may only be this much bigger than a serial run
+PREVIEW_RENDERS = 20
+DEFAULT_IMAGE = "medium.jpg"
+
+# Name pools. Most names are plain ASCII; accented Latin names are common, and a few
+# scripts Helvetica can't encode at all exercise the per-name fallback when fitting.
+FIRST_NAMES = ("James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David",
+               "Elizabeth", "William", "Barbara", "Chris", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+               "Mohammed", "Priya", "Wei", "Yuki", "Olga", "Kwame", "Ana", "Luis", "Emma", "Noah", "Al", "Jo",
+               "Alexandria", "Bartholomew", "Maximilian", "Guinevere")
+ACCENTED_FIRST_NAMES = ("José", "Zoë", "François", "Inès", "Søren", "Björn", "Łukasz", "Renée", "Ñandú",
+                        "Chloé", "André", "Máire", "Dvořák")
+LAST_NAMES = ("Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Lee",
+              "O'Brien", "McAllister", "Nguyen", "Patel", "Kim", "Ng", "Li", "Okonkwo", "Kowalski",
+              "Papadopoulos", "Vanderbilt", "Christodoulopoulos", "Featherstonehaugh")
+ACCENTED_LAST_NAMES = ("Müller", "Gonçalves", "Núñez", "Ørsted", "Šimůnek", "Sjöberg", "Doležal",
+                       "Fernández", "Löwenström", "Ó Súilleabháin")
+NON_LATIN_NAMES = (("伟", "王"), ("Ольга", "Иванова"), ("Γιώργος", "Παπαδόπουλος"), ("さくら", "佐藤"),
+                   ("민준", "김"), ("Ahmad", "الحسن"))
+PARTICLES = ("van der", "de la", "von", "da", "al", "bin", "Mac")
+LONG_LAST_NAME = "Wolfeschlegelsteinhausenbergerdorff"
+
+# Ticket images (width, height, format), covering small scans to large print-ready files
+IMAGES = {
+    "small.jpg": (600, 350, "JPEG"),
+    "medium.jpg": (2400, 1400, "JPEG"),
+    "medium.png": (2400, 1400, "PNG"),  # With transparency, so it is composited onto white
+    "large.jpg": (6000, 3500, "JPEG"),
+}
+
+# create_pdf option sets: (label, settings overrides)
+PDF_OPTIONS = [
+    (("batch" if batch else "grid") + ("+counter" if counter else "") + ("+outline" if outline else ""),
+     {"batch_mode": batch, "counter_enabled": counter, "title_outline": outline, "name_outline": outline})
+    for batch in (False, True) for counter in (False, True) for outline in (False, True)
+]
+
+
+def synth_name(rng):
+    """One (first, last) pair with a realistic mix of lengths and scripts"""
+    r = rng.random()
+    if r < 0.02:
+        return rng.choice(NON_LATIN_NAMES)
+    first = rng.choice(ACCENTED_FIRST_NAMES if r < 0.12 else FIRST_NAMES)
+    last = rng.choice(ACCENTED_LAST_NAMES if r < 0.17 else LAST_NAMES)
+    
+    r = rng.random()
+    if r < 0.08:
+        first = f"{first} {rng.choice(FIRST_NAMES)}"  # Double first name
+    elif r < 0.14:
+        first = f"{first} {rng.choice('ABCDEFGHJKLMNPRSTW')}."  # Middle initial
+    r = rng.random()
+    if r < 0.07:
+        last = f"{last}-{rng.choice(LAST_NAMES)}"  # Hyphenated
+    elif r < 0.10:
+        last = f"{rng.choice(PARTICLES)} {last}"
+    elif r < 0.101:
+        last = LONG_LAST_NAME
+    return first, last
+
+
+def write_attendee_csv(path, rows, seed=1):
+    """Attendee CSV in the app's format (column A = last, column B = first)"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for _ in range(rows):
+            first, last = synth_name(rng)
+            if rng.random() < 0.01:
+                writer.writerow([f"{last}, {first}"])  # Whole name in column A
+            else:
+                writer.writerow([last, first])
+
+
+def write_ticket_image(path, width, height, fmt):
+    """A ticket-like image: gradient, border, some text-like blocks and photo noise"""
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    img = Image.merge('RGB', (gradient, noise, Image.eval(gradient, lambda v: 255 - v)))
+    draw = ImageDraw.Draw(img)
+    border = max(4, width // 60)
+    draw.rectangle([border, border, width - border, height - border], outline=(250, 220, 90), width=border // 2)
+    rng = random.Random(width)
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle([x, y, x + width // 8, y + height // 30], fill=(20, 20, 40))
+    if fmt == "PNG":
+        img.putalpha(Image.linear_gradient('L').rotate(90).resize((width, height)).point(lambda v: 128 + v // 2))
+        img.save(path, fmt, optimize=False)
+    else:
+        img.save(path, fmt, quality=90)
+
+
+def prepare_inputs(workdir, row_counts):
+    """Create (or reuse) the synthetic CSVs and images; returns {name: path}"""
+    os.makedirs(workdir, exist_ok=True)
+    paths = {}
+    for rows in row_counts:
+        path = os.path.join(workdir, f"attendees_{rows}.csv")
+        if not os.path.exists(path):
+            print(f"Writing {os.path.basename(path)}...")
+            write_attendee_csv(path, rows)
+        paths[f"csv{rows}"] = path
+    for name, (width, height, fmt) in IMAGES.items():
+        path = os.path.join(workdir, name)
+        if not os.path.exists(path):
+            print(f"Writing {name}...")
+            write_ticket_image(path, width, height, fmt)
+        paths[name] = path
+    return paths
+
+
+def build_cases(row_counts):
+    """Benchmark cases as (name, kind, params); kind is pdf, blanks or preview"""
+    cases = []
+    for rows in row_counts:
+        for i, (label, options) in enumerate(PDF_OPTIONS):
+            if rows > MATRIX_MAX_ROWS and i not in (0, len(PDF_OPTIONS) - 1):
+                continue
+            cases.append((f"pdf/{rows}/{label}", "pdf", {"rows": rows, "image": DEFAULT_IMAGE, "options": options}))
+        if rows >= PARALLEL_MIN_ROWS:
+            label, options = PDF_OPTIONS[0]
+            cases.append((f"pdf/{rows}/{label}@{PARALLEL_WORKERS}workers", "pdf",
+                          {"rows": rows, "image": DEFAULT_IMAGE, "options": options, "workers": PARALLEL_WORKERS,
+                           "serial": f"pdf/{rows}/{label}"}))
+    for image in IMAGES:
+        if image != DEFAULT_IMAGE:
+            cases.append((f"pdf/100/grid@{image}", "pdf", {"rows": 100, "image": image, "options": {}}))
+    for pages in BLANK_PAGES:
+        for counter in (False, True):
+            options = {"blank_pages": pages, "counter_enabled": counter, "extra_text": "General Admission"}
+            label = f"{pages}p" + ("+counter" if counter else "")
+            cases.append((f"blanks/{label}", "blanks", {"image": DEFAULT_IMAGE, "options": options}))
+    for mode in ("ticket", "layout"):
+        for image in IMAGES:
+            cases.append((f"preview/{mode}@{image}", "preview", {"mode": mode, "image": image}))
+    return cases
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None if it can't be measured)"""
+    try:
+        # Linux: unlike ru_maxrss, VmHWM doesn't carry over the parent's peak across exec
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if HAS_RESOURCE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    if HAS_PSUTIL:
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    return None
+
+
+def run_pdf_case(kind, params, inputs, output):
+    settings = TicketSettings().updated(params["options"])
+    image = inputs[params["image"]]
+    start = time.perf_counter()
+    if kind == "blanks":
+        stats = TicketRenderer(settings, image).create_blanks_pdf(output)
+    else:
+        renderer = TicketRenderer(settings, image, inputs[f"csv{params['rows']}"])
+        stats = renderer.create_pdf(output, params.get("workers", 1))
+    seconds = time.perf_counter() - start
+    size = os.path.getsize(output)
+    os.remove(output)
+    return {"seconds": round(seconds, 4), "output_bytes": size, "phases": stats.to_dict()["phases"]}
+
+
+def run_preview_case(params, inputs):
+    """Time update_ticket_preview / update_layout_preview on a hidden app window"""
+    import ticket_generator as gui
+    root = gui.ttk.Window(themename="flatly")
+    root.withdraw()
+    try:
+        app = gui.TicketGeneratorApp(root)
+        app.image_path = inputs[params["image"]]
+        app.load_ticket_image(app.image_path)
+        app.auto_fit_to_image()
+        app.csv_path = inputs["csv100"]
+        app.load_attendees(app.csv_path)
+        app.preview_mode.set(params["mode"])
+        render = app.update_ticket_preview if params["mode"] == "ticket" else app.update_layout_preview
+        
+        # First render is cold (nothing cached); the rest move the name like a drag would
+        start = time.perf_counter()
+        render()
+        root.update_idletasks()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(PREVIEW_RENDERS):
+            app.name_y_pos = 0.08 + 0.005 * (i % 10)
+            render()
+            root.update_idletasks()
+        seconds = (time.perf_counter() - start) / PREVIEW_RENDERS
+        return {"seconds": round(seconds, 5), "first_seconds": round(first, 5)}
+    finally:
+        root.destroy()
+
+
+def run_case(case, inputs, workdir):
+    """Process pool worker: run one case and add the peak memory"""
+    name, kind, params = case
+    output = os.path.join(workdir, f"out_{os.getpid()}.pdf")
+    if kind == "preview":
+        result = run_preview_case(params, inputs)
+    else:
+        result = run_pdf_case(kind, params, inputs, output)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def preview_unavailable():
+    """Reason preview cases can't run here, or None"""
+    try:
+        import tkinter
+        root = tkinter.Tk()
+        root.destroy()
+        import ticket_generator  # noqa: F401 (needs ttkbootstrap)
+    except ImportError as e:
+        return f"missing module: {e.name}"
+    except Exception as e:
+        return f"no display ({e})"
+    return None
+
+
+def run_benchmarks(cases, inputs, workdir, repeat=1):
+    """Run each case in a fresh process (best of repeat) and return {name: result}"""
+    results = {}
+    skip_preview = None
+    if any(kind == "preview" for _, kind, _ in cases):
+        skip_preview = preview_unavailable()
+    context = multiprocessing.get_context("spawn")
+    for case in cases:
+        name, kind, _ = case
+        if kind == "preview" and skip_preview:
+            results[name] = {"skipped": skip_preview}
+            print(f"{name:<40} skipped ({skip_preview})")
+            continue
+        best = None
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_case, case, inputs, workdir).result()
+            if best is None or result["seconds"] < best["seconds"]:
+                best = result
+        results[name] = best
+        print(format_row(name, best))
+    return results
+
+
+def format_row(name, result, base=None):
+    if "skipped" in result:
+        return f"{name:<40} skipped ({result['skipped']})"
+    row = f"{name:<40} {result['seconds']:>10.3f}s"
+    if base and base.get("seconds"):
+        row += f" ({(result['seconds'] / base['seconds'] - 1) * 100:+6.1f}%)"
+    if result.get("peak_rss_mb") is not None:
+        row += f"  {result['peak_rss_mb']:>8.1f} MB"
+    if "output_bytes" in result:
+        row += f"  {result['output_bytes'] / 1024:>10.1f} KB"
+    return row
+
+
+def find_regressions(results, baseline, tolerance, size_tolerance=0.02):
+    """Cases slower, bigger in memory or bigger on disk than the baseline allows"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or "skipped" in result or "skipped" in base:
+            continue
+        for metric, allowed in (("seconds", tolerance), ("peak_rss_mb", tolerance),
+                                ("output_bytes", size_tolerance)):
+            new, old = result.get(metric), base.get(metric)
+            if new is not None and old and new > old * (1 + allowed):
+                regressions.append(f"{name}: {metric} {old} -> {new} ({(new / old - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def find_parallel_bloat(results, cases):
+    """Parallel cases whose merged PDF is noticeably bigger than the same run done serially"""
+    problems = []
+    for name, _, params in cases:
+        serial = results.get(params.get("serial"))
+        result = results.get(name)
+        if not serial or not result or "skipped" in result or "skipped" in serial:
+            continue
+        new, old = result["output_bytes"], serial["output_bytes"]
+        if new > old * (1 + PARALLEL_SIZE_TOLERANCE):
+            problems.append(f"{name}: {new} bytes vs {old} serial ({(new / old - 1) * 100:+.1f}%)")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ticket PDF generation and preview rendering")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "ticket_bench"),
+                        help="where the synthetic CSVs and images are kept (reused between runs)")
+    parser.add_argument("--quick", action="store_true", help="skip the 1M-row attendee list")
+    parser.add_argument("--only", action="append", default=[], metavar="PATTERN",
+                        help="run only cases matching this glob, e.g. 'pdf/10000/*' (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1, help="run each case N times and keep the fastest")
+    parser.add_argument("--baseline", help="compare against this baseline JSON (exit 1 on regressions)")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown / memory growth over the baseline (default 0.15 = 15%%)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the results as a new baseline")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+    
+    row_counts = QUICK_ROW_COUNTS if args.quick else ROW_COUNTS
+    cases = build_cases(row_counts)
+    if args.only:
+        cases = [case for case in cases if any(fnmatch.fnmatch(case[0], p) for p in args.only)]
+    if args.list:
+        for name, _, _ in cases:
+            print(name)
+        return 0
+    
+    inputs = prepare_inputs(args.workdir, row_counts)
+    results = run_benchmarks(cases, inputs, args.workdir, args.repeat)
+    
+    bloat = find_parallel_bloat(results, cases)
+    if bloat:
+        print(f"\nParallel output more than {PARALLEL_SIZE_TOLERANCE:.0%} bigger than serial:")
+        for line in bloat:
+            print(f"  {line}")
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({"version": BASELINE_VERSION, "python": platform.python_version(),
+                       "platform": platform.platform(), "results": results}, f, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        print("\nCompared to baseline:")
+        for name, result in results.items():
+            print(format_row(name, result, baseline.get(name)))
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions")
+    return 1 if bloat else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Tests for the ticket rendering engine (run with pytest)"""
+
+import csv
+
+import pytest
+from PIL import Image
+
+from ticket_engine import TicketRenderer, TicketSettings
+
+pypdf = pytest.importorskip("pypdf")
+
+# 4.25" x 5.5" tickets make a 2 x 2 grid on a portrait letter page, so 5 tickets per
+# attendee don't fit on one page
+TALL_TICKETS = {"ticket_width": 4.25, "ticket_height": 5.5, "tickets_per_attendee": 5,
+                "counter_enabled": True, "title": ""}
+
+
+def write_csv(path, count):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows([f"Last{i}", f"First{i}"] for i in range(count))
+
+
+def page_texts(path):
+    return [page.extract_text() for page in pypdf.PdfReader(path).pages]
+
+
+def test_tickets_run_on_to_the_next_page(tmp_path):
+    csv_path, output = tmp_path / "attendees.csv", tmp_path / "tickets.pdf"
+    write_csv(csv_path, 3)
+    renderer = TicketRenderer(TicketSettings().updated(TALL_TICKETS), Image.new('RGB', (60, 80), 'white'),
+                              str(csv_path))
+    stats = renderer.create_pdf(str(output))
+    
+    texts = page_texts(output)
+    assert len(texts) == renderer.calculate_total_pages() == 4  # 15 tickets, 4 per page
+    assert stats.counters["tickets"] == 15
+    assert texts[0].count("First0") == 4
+    assert texts[1].count("First0") == 1 and texts[1].count("First1") == 3
+    assert texts[3].count("First2") == 3
+
+
+def test_sharded_run_on_pages_match_serial(tmp_path):
+    csv_path = tmp_path / "attendees.csv"
+    write_csv(csv_path, 103)
+    settings = TicketSettings().updated(dict(TALL_TICKETS, counter_mode="Sequential"))
+    image = Image.new('RGB', (60, 80), 'white')
+    TicketRenderer(settings, image, str(csv_path)).create_pdf(str(tmp_path / "serial.pdf"))
+    TicketRenderer(settings, image, str(csv_path)).create_pdf(str(tmp_path / "sharded.pdf"), workers=2)
+    
+    assert page_texts(tmp_path / "sharded.pdf") == page_texts(tmp_path / "serial.pdf")
@@ -0,0 +1,1999 @@
+#!/usr/bin/env python3
+"""
+Ticket rendering engine
+Headless PDF generation for Alyssa's Ticket Maker (no Tk required).
+Repository: https://github.com/riconanci/TicketGen
+
+Usage:
+    python ticket_engine.py --csv attendees.csv --image ticket.png -o tickets.pdf
+    python ticket_engine.py --blanks --image ticket.png -o blanks.pdf --set blank_pages=10
+    python ticket_engine.py --jobs event1.json event2.json
+"""
+
+import argparse
+import codecs
+import cProfile
+import csv
+import json
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from queue import Empty
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache, wraps
+from io import BytesIO
+from PIL import Image
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# NumPy is only needed to measure and fit names in bulk
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# pypdf is only needed to stitch shards together in parallel mode (4.3 or later, which
+# can fold the copies of the ticket image every shard embeds back into one)
+try:
+    from pypdf import PdfWriter
+    HAS_PYPDF = hasattr(PdfWriter, "compress_identical_objects")
+except ImportError:
+    HAS_PYPDF = False
+
+
+COUNTER_RED = "#C41E3A"
+COUNTER_RED_RGB = (0.769, 0.118, 0.227)  # #C41E3A
+
+ORIENTATIONS = ("Portrait", "Landscape")
+COUNTER_MODES = ("Per Attendee", "Sequential")
+COUNTER_COLORS = ("Red", "Black")
+ROTATIONS = (0, 90, 180, 270)
+PRINT_DPI_OPTIONS = (150, 216, 300, 600)  # Embedded image resolutions offered in the GUI (216 = 3 px per point)
+DEFAULT_PRINT_DPI = 216
+IMAGE_ENCODINGS = ("auto", "flate")  # auto: JPEG artwork may stay JPEG if that is smaller
+JPEG_QUALITY = 90  # Quality of the one-time re-encode of JPEG artwork at the embedded size
+
+
+def derived():
+    """Dataclass field computed in __post_init__ (not an option, not saved)"""
+    return field(init=False, repr=False, compare=False)
+
+
+@dataclass(frozen=True)
+class TicketSettings:
+    """Immutable, validated snapshot of all options that affect the generated PDF
+    
+    Taken once before generation starts so the page loop never touches Tk variables.
+    Values that only depend on the settings (fonts, colors, point sizes) are derived
+    once in __post_init__.
+    """
+    # Title
+    title: str = "DRINK TICKET"
+    title_font_size: int = 10
+    title_bold: bool = True
+    title_color: str = "#000000"
+    title_outline: bool = False
+    title_underline: bool = False
+    title_x_pos: float = 0.0
+    title_y_pos: float = -0.25
+    
+    # Name (also used for Extra text in blanks mode)
+    name_font_size: int = 14
+    name_bold: bool = True
+    name_color: str = "#000000"
+    name_outline: bool = False
+    name_underline: bool = False
+    name_x_pos: float = 0.0
+    name_y_pos: float = 0.08
+    swap_names: bool = False
+    hide_last_name: bool = False
+    auto_fit_names: bool = True
+    center_lock: bool = True
+    
+    # Layout
+    orientation: str = "Portrait"
+    ticket_width: float = 3.0  # inches
+    ticket_height: float = 1.75  # inches
+    tickets_per_attendee: int = 5
+    align_top_left: bool = True
+    batch_mode: bool = False
+    cutting_guides: bool = True
+    bw_mode: bool = False
+    print_dpi: int = DEFAULT_PRINT_DPI  # Resolution of the embedded ticket image
+    image_encoding: str = "auto"  # "auto" or "flate" (always lossless)
+    name_forms: bool = False  # Share each outlined name block between an attendee's tickets
+    
+    # Counter
+    counter_enabled: bool = False
+    counter_mode: str = "Per Attendee"  # "Per Attendee" or "Sequential"
+    counter_size: int = 10
+    counter_color: str = "Red"  # "Red" or "Black"
+    counter_repeat: int = 5  # Blanks mode: cycle 1 to X
+    counter_start: int = 1  # Blanks mode: starting number
+    counter_x_pos: float = 0.0
+    counter_y_pos: float = 0.35
+    counter_rotation: int = 0  # 0, 90, 180, 270
+    
+    # Blanks mode
+    extra_text: str = ""
+    blank_pages: int = 1
+    
+    # Derived values
+    page_w: float = derived()
+    page_h: float = derived()
+    ticket_w: float = derived()
+    ticket_h: float = derived()
+    size_factor: float = derived()
+    title_text: str = derived()
+    title_font: str = derived()
+    title_pt: int = derived()
+    title_fill: tuple = derived()
+    name_font: str = derived()
+    name_pt: int = derived()
+    name_fill: tuple = derived()
+    counter_pt: int = derived()
+    counter_fill: tuple = derived()
+    max_text_width: float = derived()
+    title_dx: float = derived()
+    title_dy: float = derived()
+    name_dx: float = derived()
+    name_dy: float = derived()
+    counter_dx: float = derived()
+    counter_dy: float = derived()
+    
+    def __post_init__(self):
+        self.validate()
+        
+        def derive(name, value):
+            object.__setattr__(self, name, value)
+        
+        page_w, page_h = get_page_dimensions(self.orientation)
+        ticket_w, ticket_h = self.ticket_width * inch, self.ticket_height * inch
+        size_factor = min(ticket_w / (3*inch), ticket_h / (1.75*inch))
+        derive("page_w", page_w)
+        derive("page_h", page_h)
+        derive("ticket_w", ticket_w)
+        derive("ticket_h", ticket_h)
+        derive("size_factor", size_factor)
+        
+        derive("title_text", self.title.strip())
+        derive("title_font", "Helvetica-Bold" if self.title_bold else "Helvetica")
+        derive("title_pt", max(6, int(self.title_font_size * size_factor * 1.8)))
+        # B&W mode prints text in gray too, so the whole page stays DeviceGray
+        fill = gray_floats if self.bw_mode else rgb_floats
+        derive("title_fill", fill(self.title_color))
+        
+        derive("name_font", "Helvetica-Bold" if self.name_bold else "Helvetica")
+        derive("name_pt", max(6, int(self.name_font_size * size_factor * 1.8)))
+        derive("name_fill", fill(self.name_color))
+        
+        derive("counter_pt", max(6, int(self.counter_size * size_factor * 1.8)))
+        if self.bw_mode:
+            derive("counter_fill", gray_floats(COUNTER_RED if self.counter_color == "Red" else "#000000"))
+        else:
+            derive("counter_fill", COUNTER_RED_RGB if self.counter_color == "Red" else (0, 0, 0))
+        
+        # Text anchors relative to the lower-left corner of a ticket.
+        # PDF Y is bottom-up: negative y_pos (above center in preview) = higher Y in PDF.
+        cx, cy = ticket_w / 2, ticket_h / 2
+        derive("max_text_width", ticket_w * 0.85)  # Auto-fit limit: 85% of ticket width
+        derive("title_dx", cx + (0 if self.center_lock else self.title_x_pos * ticket_w))
+        derive("title_dy", cy - (self.title_y_pos * ticket_h) - self.title_pt * 0.35)  # Baseline
+        derive("name_dx", cx + (0 if self.center_lock else self.name_x_pos * ticket_w))
+        derive("name_dy", cy - (self.name_y_pos * ticket_h))  # Center of the name block
+        derive("counter_dx", cx + (self.counter_x_pos * ticket_w))
+        derive("counter_dy", cy - (self.counter_y_pos * ticket_h))
+    
+    def validate(self):
+        """Raise ValueError for settings the renderer cannot handle"""
+        if self.orientation not in ORIENTATIONS:
+            raise ValueError(f"orientation must be one of {ORIENTATIONS}, got {self.orientation!r}")
+        if self.counter_mode not in COUNTER_MODES:
+            raise ValueError(f"counter_mode must be one of {COUNTER_MODES}, got {self.counter_mode!r}")
+        if self.counter_color not in COUNTER_COLORS:
+            raise ValueError(f"counter_color must be one of {COUNTER_COLORS}, got {self.counter_color!r}")
+        if self.image_encoding not in IMAGE_ENCODINGS:
+            raise ValueError(f"image_encoding must be one of {IMAGE_ENCODINGS}, got {self.image_encoding!r}")
+        if self.counter_rotation not in ROTATIONS:
+            raise ValueError(f"counter_rotation must be one of {ROTATIONS}, got {self.counter_rotation!r}")
+        for name in ("ticket_width", "ticket_height", "title_font_size", "name_font_size",
+                     "counter_size", "tickets_per_attendee", "blank_pages", "print_dpi"):
+            if getattr(self, name) <= 0:
+                raise ValueError(f"{name} must be positive, got {getattr(self, name)!r}")
+        for name in ("title_color", "name_color"):
+            try:
+                hex_to_rgb(getattr(self, name))
+            except ValueError:
+                raise ValueError(f"{name} must be a #RRGGBB color, got {getattr(self, name)!r}") from None
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build settings from a plain dict (e.g. loaded from JSON)"""
+        return cls().updated(data)
+    
+    def updated(self, data):
+        """Return a copy with the given fields replaced (string values are converted)"""
+        known = {f.name for f in fields(self) if f.init}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown setting(s): {', '.join(sorted(unknown))}")
+        return replace(self, **coerce_settings(data))
+    
+    def to_dict(self):
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+    
+    @property
+    def page_size(self):
+        return self.page_w, self.page_h
+    
+    @property
+    def ticket_size(self):
+        return self.ticket_w, self.ticket_h
+    
+    def grid(self):
+        return calculate_grid(self.page_size, self.ticket_size, self.tickets_per_attendee, self.batch_mode)
+    
+    def page_cycle(self):
+        return page_cycle(self.grid(), self.tickets_per_attendee, self.batch_mode)
+    
+    def page_count(self, count):
+        return count_pages(count, self.grid(), self.tickets_per_attendee, self.batch_mode)
+
+
+def coerce_settings(data):
+    """Convert string values (CLI / Tk variables) to the field types of TicketSettings"""
+    types = {f.name: f.type for f in fields(TicketSettings) if f.init}
+    result = {}
+    for key, value in data.items():
+        field_type = types.get(key)
+        if field_type is bool:
+            if isinstance(value, str):
+                value = value.strip().lower() in ("1", "true", "yes", "on")
+            else:
+                value = bool(value)
+        elif field_type is int:
+            value = int(float(value))
+        elif field_type is float:
+            value = float(value)
+        result[key] = value
+    return result
+
+
+def hex_to_rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    if len(hex_color) != 6:
+        raise ValueError(f"Invalid hex color: #{hex_color}")
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def rgb_floats(hex_color):
+    """Hex color as the 0-1 floats reportlab expects"""
+    return tuple(v / 255 for v in hex_to_rgb(hex_color))
+
+
+def gray_level(hex_color):
+    """Gray value (0-255) of a color, weighted like PIL's convert('L')"""
+    r, g, b = hex_to_rgb(hex_color)
+    return round(r * 0.299 + g * 0.587 + b * 0.114)
+
+
+def gray_floats(hex_color):
+    """Hex color as a 1-tuple gray level for set_fill/set_stroke (B&W mode)"""
+    return (gray_level(hex_color) / 255,)
+
+
+def set_fill(c, color):
+    """Set the fill color from an (r, g, b) tuple, or a (gray,) tuple in B&W mode"""
+    if len(color) == 1:
+        c.setFillGray(color[0])
+    else:
+        c.setFillColorRGB(*color)
+
+
+def set_stroke(c, color):
+    """Set the stroke color from an (r, g, b) tuple, or a (gray,) tuple in B&W mode"""
+    if len(color) == 1:
+        c.setStrokeGray(color[0])
+    else:
+        c.setStrokeColorRGB(*color)
+
+
+def get_page_dimensions(orientation):
+    if orientation == "Landscape":
+        return landscape(letter)
+    return letter
+
+
+def calculate_grid(page_size, ticket_size, tpa, batch_mode):
+    """Return (cols, rows, attendees per page, rows per attendee) for a page"""
+    page_w, page_h = page_size
+    ticket_w, ticket_h = ticket_size
+    
+    cols = max(1, int(page_w // ticket_w))
+    rows = max(1, int(page_h // ticket_h))
+    
+    if batch_mode:
+        # Batch mode ON: group tickets by attendee in rows
+        rows_per_att = math.ceil(tpa / cols)
+        att_per_page = max(1, rows // rows_per_att)
+    else:
+        # Batch mode OFF: fill entire page, attendees not grouped
+        total_slots = cols * rows
+        att_per_page = max(1, total_slots // tpa)
+        rows_per_att = math.ceil(tpa / cols)  # Still needed for some calculations
+    
+    return cols, rows, att_per_page, rows_per_att
+
+
+def page_cycle(grid, tpa, batch_mode):
+    """Return (pages, attendees) of the shortest run of whole pages that starts and ends
+    on an attendee boundary
+    
+    That is one page, unless batch mode is off and an attendee has more tickets than a
+    page holds: then the tickets run on across pages without gaps, and e.g. 5 tickets
+    each on 4-ticket pages come back to an attendee boundary every 5 pages (4 attendees).
+    """
+    cols, rows, att_per_page, _ = grid
+    slots = cols * rows
+    if batch_mode or tpa <= slots:
+        return 1, att_per_page
+    common = math.gcd(slots, tpa)
+    return tpa // common, slots // common
+
+
+def count_pages(count, grid, tpa, batch_mode):
+    """Number of pages count attendees fill"""
+    cols, rows, att_per_page, _ = grid
+    if batch_mode or tpa <= cols * rows:
+        return math.ceil(count / att_per_page)
+    return math.ceil(count * tpa / (cols * rows))
+
+
+def split_name_row(row):
+    """Turn a CSV row (column A = last, column B = first) into a (first, last) record
+    
+    Returns None for rows without a name. Gives the same result as joining the cells
+    into "Last, First" and running parse_name on it.
+    """
+    if not row:
+        return None
+    last = row[0].strip()
+    if not last:
+        return None
+    first = row[1].strip() if len(row) >= 2 else ""
+    if ',' in last:
+        # Rare: column A itself is "Last, First"
+        return parse_name(f"{last}, {first}" if first else last)
+    if first:
+        return first, last
+    return last, ""
+
+
+def csv_lines(f, position):
+    """Decoded lines of an attendee CSV opened in binary mode, for csv.reader
+    
+    Splits on the same line endings as text mode with newline='' and drops a UTF-8 BOM
+    at the start of the file. position[0] (a byte offset) is moved past each line as it
+    is handed out, so once csv.reader yields a row it is where the next row starts.
+    """
+    first = f.tell() == 0
+    for chunk in f:
+        for line in chunk.splitlines(keepends=True):
+            position[0] += len(line)
+            if first:
+                line = line.removeprefix(codecs.BOM_UTF8)
+                first = False
+            yield line.decode('utf-8')
+
+
+def iter_attendees(path, stats=None, offset=0):
+    """Lazily yield (first, last) records from an attendee CSV (time spent reading rows
+    counts as the csv phase of stats), starting at a byte offset from count_attendees"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        rows = csv.reader(csv_lines(f, [offset]))
+        if stats is not None:
+            rows = stats.timed(rows, "csv")
+        for row in rows:
+            record = split_name_row(row)
+            if record is not None:
+                yield record
+
+
+def count_attendees(path, offsets=None, every=1):
+    """Count attendee rows without keeping any names in memory
+    
+    If offsets is a list, the byte offsets where attendees 0, every, 2 * every, ... start
+    are appended to it, so iter_attendees can later start at any of them directly.
+    """
+    count = 0
+    with open(path, 'rb') as f:
+        position = [0]
+        if offsets is not None:
+            offsets.append(0)
+        for row in csv.reader(csv_lines(f, position)):
+            if row and row[0].strip():
+                count += 1
+                if offsets is not None and count % every == 0:
+                    offsets.append(position[0])
+    return count
+
+
+def apply_name_options(first, last, swap=False, hide_last=False):
+    # Swap first/last order
+    if swap:
+        first, last = last, first
+    
+    # Hide last name
+    if hide_last:
+        last = ""
+    
+    return first, last
+
+
+def parse_name(full_name, swap=False, hide_last=False):
+    """Split a "Last, First" string into (first, last)"""
+    if ',' in full_name:
+        parts = full_name.split(',', 1)
+        first = parts[1].strip() if len(parts) > 1 else ""
+        last = parts[0].strip()
+    else:
+        first = full_name.strip()
+        last = ""
+    return apply_name_options(first, last, swap, hide_last)
+
+
+def fit_font_size(width_at, size, max_width, step=0.5, min_size=4):
+    """Shrink size step by step until width_at(size) <= max_width, giving up once it
+    reaches min_size (a size at or below min_size is returned as is)
+    
+    Gives the same size as stepping down one step at a time, but bisects over the
+    candidate sizes, so only O(log n) widths are measured. width_at must not decrease
+    as the size grows.
+    """
+    if size <= min_size or width_at(size) <= max_width:
+        return size
+    # Candidates are size - k * step; the last one (at or below min_size) is not checked
+    lo, hi = 0, math.ceil((size - min_size) / step)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if width_at(size - mid * step) <= max_width:
+            hi = mid
+        else:
+            lo = mid
+    return size - hi * step
+
+
+def fit_name_size(s, first, last, stats=None):
+    """Name font size for one attendee: name_pt, auto-fit to the ticket width if enabled"""
+    if not s.auto_fit_names or not (first or last):
+        return s.name_pt
+    
+    def width_at(size):
+        if stats is not None:
+            stats.count("string_widths", bool(first) + bool(last))
+        first_w = stringWidth(first, s.name_font, size) if first else 0
+        last_w = stringWidth(last, s.name_font, size) if last else 0
+        return max(first_w, last_w)
+    
+    return fit_font_size(width_at, s.name_pt, s.max_text_width)
+
+
+MIN_READABLE_PT = 7  # Names fitted below this are reported as hard to read
+FIT_CHUNK = 4096  # Names fitted per bulk pass when streaming
+
+
+@lru_cache(maxsize=None)
+def width_table(font_name):
+    """Glyph advance widths (1/1000 em) of a standard font, indexed by its encoded bytes"""
+    return np.array(pdfmetrics.getFont(font_name).widths, dtype=np.int64)
+
+
+def text_units(font_name, texts):
+    """Widths of many texts at 1pt x 1000, in one NumPy pass
+    
+    Texts the font's own encoding can't represent (reportlab measures those with
+    substitute fonts) come back as -1.
+    """
+    encoding = pdfmetrics.getFont(font_name).encName
+    encoded = []
+    for text in texts:
+        try:
+            encoded.append(text.encode(encoding))
+        except UnicodeEncodeError:
+            encoded.append(None)
+    lengths = np.array([len(e) if e is not None else 0 for e in encoded], dtype=np.int64)
+    codes = np.frombuffer(b"".join(e for e in encoded if e is not None), dtype=np.uint8)
+    
+    # Per-text sums as differences of the running total over all glyphs
+    totals = np.concatenate(([0], np.cumsum(width_table(font_name)[codes])))
+    ends = np.cumsum(lengths)
+    units = totals[ends] - totals[ends - lengths]
+    units[[i for i, e in enumerate(encoded) if e is None]] = -1
+    return units
+
+
+def fit_name_sizes(s, names, stats=None):
+    """fit_name_size for a whole list of (first, last) names
+    
+    With NumPy the standard-font widths are looked up for all names at once. Width is
+    linear in size, so each fitted size is solved for directly and then checked against
+    its neighbouring step, giving exactly the sizes the one-at-a-time fitter would.
+    """
+    if not HAS_NUMPY or not s.auto_fit_names or not names:
+        return [fit_name_size(s, first, last, stats) for first, last in names]
+    
+    firsts, lasts = zip(*names)
+    first_units = text_units(s.name_font, firsts)
+    last_units = text_units(s.name_font, lasts)
+    units = np.maximum(first_units, last_units)
+    
+    size, step, min_size = s.name_pt, 0.5, 4
+    max_k = max(0, math.ceil((size - min_size) / step))
+    
+    def fits(k):
+        return units * 0.001 * (size - k * step) <= s.max_text_width
+    
+    with np.errstate(divide='ignore'):
+        k = np.ceil((size - s.max_text_width / (units * 0.001)) / step)
+    k = np.clip(np.nan_to_num(k, nan=0.0, neginf=0.0), 0, max_k).astype(np.int64)
+    # Rounding can put the estimate one step off either way
+    k = np.where((k < max_k) & ~fits(k), k + 1, k)
+    k = np.where((k > 0) & fits(k - 1), k - 1, k)
+    sizes = (size - k * step).tolist()
+    
+    for i in np.flatnonzero((first_units < 0) | (last_units < 0)):
+        sizes[i] = fit_name_size(s, *names[i], stats)
+    return sizes
+
+
+def iter_fitted_names(s, names, chunk_size=FIT_CHUNK, stats=None):
+    """Yield (first, last, name_size) for a stream of names, fitting a chunk at a time"""
+    names = iter(names)
+    chunk = list(islice(names, chunk_size))
+    while chunk:
+        if stats is not None:
+            stats.start("fit")
+        sizes = fit_name_sizes(s, chunk, stats)
+        if stats is not None:
+            stats.stop()
+        for (first, last), name_size in zip(chunk, sizes):
+            yield first, last, name_size
+        chunk = list(islice(names, chunk_size))
+
+
+def get_processed_image(img, bw_mode):
+    """Get a copy of the ticket image with B&W filter applied if enabled
+    
+    B&W images are single-channel ('L', or 'LA' to keep transparency), so they are
+    embedded in the PDF as DeviceGray.
+    """
+    if img is None:
+        return None
+    
+    if bw_mode:
+        return img.convert('LA' if img.mode in ('RGBA', 'LA') else 'L')
+    return img.copy()
+
+
+def begin_ticket_form(c, s, name):
+    """Start a reusable form XObject drawn in ticket coordinates (origin = lower-left corner)
+    
+    The bounding box is generous so text dragged past the ticket edge is not clipped.
+    Finish it with c.endForm() and draw it with place_form().
+    """
+    c.beginForm(name, -s.page_w, -s.page_h, s.page_w, s.page_h)
+    return name
+
+
+def place_form(c, name, x, y):
+    """Draw a form created by begin_ticket_form with its origin at x, y"""
+    c.saveState()
+    c.translate(x, y)
+    c.doForm(name)
+    c.restoreState()
+
+
+def draw_text_outline(c, x, y, text):
+    """Draw the white outline behind a centred string, in the current font
+    
+    The outline is a real 2pt white stroke (reaching 1pt past the glyph edges, like the
+    old copies offset by 1pt in 8 directions) drawn in text render mode 1 (stroke only).
+    Draw the filled text on top afterwards.
+    """
+    c.saveState()
+    c.setStrokeGray(1)
+    c.setLineWidth(2)
+    c.setLineJoin(1)  # Round joins keep sharp corners from spiking
+    c.drawCentredString(x, y, text, mode=1)
+    c.restoreState()
+
+
+def draw_title(c, s, x, y):
+    """Draw the title of the ticket whose lower-left corner is at x, y"""
+    title = s.title_text
+    if not title:
+        return
+    
+    title_x, title_y = x + s.title_dx, y + s.title_dy
+    c.setFont(s.title_font, s.title_pt)
+    
+    if s.title_outline:
+        draw_text_outline(c, title_x, title_y, title)
+    
+    set_fill(c, s.title_fill)
+    c.drawCentredString(title_x, title_y, title)
+    
+    # Title underline
+    if s.title_underline:
+        title_width = c.stringWidth(title, s.title_font, s.title_pt)
+        set_stroke(c, s.title_fill)
+        c.setLineWidth(1)
+        c.line(title_x - title_width/2, title_y - 2, title_x + title_width/2, title_y - 2)
+
+
+def draw_name(c, s, x, y, first, last, name_size):
+    """Draw the name (first above last, or a single line) of the ticket whose lower-left
+    corner is at x, y"""
+    font_name = s.name_font
+    
+    c.setFont(font_name, name_size)
+    
+    name_x, name_y_center = x + s.name_dx, y + s.name_dy
+    
+    if first and not last:
+        # Single line mode - center the name vertically
+        first_y = name_y_center - name_size * 0.35
+        
+        if s.name_outline:
+            draw_text_outline(c, name_x, first_y, first)
+        
+        set_fill(c, s.name_fill)
+        c.drawCentredString(name_x, first_y, first)
+        
+        if s.name_underline:
+            set_stroke(c, s.name_fill)
+            c.setLineWidth(1)
+            first_width = c.stringWidth(first, font_name, name_size)
+            c.line(name_x - first_width/2, first_y - 2, name_x + first_width/2, first_y - 2)
+    else:
+        # Two line mode - first name above, last name below
+        line_gap = name_size * 0.15
+        first_y = name_y_center + line_gap / 2 + name_size * 0.15
+        last_y = name_y_center - line_gap / 2 - name_size * 0.65
+        
+        if s.name_outline:
+            draw_text_outline(c, name_x, first_y, first)
+            draw_text_outline(c, name_x, last_y, last)
+        
+        set_fill(c, s.name_fill)
+        c.drawCentredString(name_x, first_y, first)
+        c.drawCentredString(name_x, last_y, last)
+        
+        if s.name_underline:
+            set_stroke(c, s.name_fill)
+            c.setLineWidth(1)
+            first_width = c.stringWidth(first, font_name, name_size)
+            last_width = c.stringWidth(last, font_name, name_size)
+            c.line(name_x - first_width/2, first_y - 2, name_x + first_width/2, first_y - 2)
+            c.line(name_x - last_width/2, last_y - 2, name_x + last_width/2, last_y - 2)
+
+
+def draw_counter(c, s, x, y, counter_num):
+    """Draw the counter number of the ticket whose lower-left corner is at x, y"""
+    counter_size = s.counter_pt
+    c.setFont("Helvetica-Bold", counter_size)
+    set_fill(c, s.counter_fill)
+    
+    # Counter position with X and Y offsets
+    counter_x = x + s.counter_dx
+    counter_y = y + s.counter_dy - counter_size * 0.35
+    
+    if s.counter_rotation == 0:
+        c.drawCentredString(counter_x, counter_y, str(counter_num))
+    else:
+        # Save state, rotate, draw, restore
+        c.saveState()
+        c.translate(counter_x, counter_y + counter_size * 0.35)
+        c.rotate(s.counter_rotation)
+        c.drawCentredString(0, -counter_size * 0.35, str(counter_num))
+        c.restoreState()
+
+
+def draw_cutting_guides(c, s, cols, rows, ox, oy):
+    """Draw dotted cutting lines between tickets"""
+    if not s.cutting_guides:
+        return
+    
+    ticket_w, ticket_h, page_h = s.ticket_w, s.ticket_h, s.page_h
+    c.setStrokeGray(0.5)
+    c.setLineWidth(0.5)
+    c.setDash(3, 3)  # Dotted line pattern
+    
+    # Vertical lines between columns
+    for col in range(cols + 1):
+        x = ox + col * ticket_w
+        y_start = page_h - oy - rows * ticket_h
+        y_end = page_h - oy
+        c.line(x, y_start, x, y_end)
+    
+    # Horizontal lines between rows
+    for row in range(rows + 1):
+        y = page_h - oy - row * ticket_h
+        x_start = ox
+        x_end = ox + cols * ticket_w
+        c.line(x_start, y, x_end, y)
+    
+    c.setDash()  # Reset to solid line
+
+
+class ImagePyramid:
+    """Ticket image decoded once at several resolutions, plus a bounded cache of
+    processed (B&W filtered and resized) copies
+    
+    get() starts from the smallest pyramid level that is still at least as big as the
+    requested size, so previews never resample the full-resolution original. For large
+    JPEGs the levels come from a draft-mode (reduced scale) decode, which is fine on
+    screen but not in print: the image embedded in the PDF asks for full_res, which
+    always resamples the full-resolution source.
+    """
+    
+    PREVIEW_BASE = 1024  # Top level is at least this big (unless the image is smaller)
+    MIN_LEVEL = 64  # Stop halving below this
+    CACHE_SIZE = 16
+    
+    def __init__(self, source, base=None, format=None):
+        self.source = source
+        self.format = format or source.format  # Of the file, kept when the image is turned
+        self.levels = self.build_levels(source if base is None else base)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()  # The preview and background generation share the cache
+        self._load_lock = threading.Lock()
+    
+    @classmethod
+    def open(cls, path):
+        source = Image.open(path)
+        base = Image.open(path)
+        if base.format == 'JPEG':
+            # Let the JPEG decoder scale down by 1/2, 1/4 or 1/8 while decoding
+            base.draft(base.mode, (cls.PREVIEW_BASE, cls.PREVIEW_BASE))
+        base.load()
+        return cls(source, base)
+    
+    @classmethod
+    def build_levels(cls, base):
+        if base.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            base = base.convert('RGBA' if 'transparency' in base.info else 'RGB')
+        # Shrink very large (non-JPEG) images down towards the preview size first
+        while min(base.size) // 2 >= cls.PREVIEW_BASE:
+            base = base.reduce(2)
+        levels = [base]
+        while min(levels[-1].size) // 2 >= cls.MIN_LEVEL:
+            levels.append(levels[-1].reduce(2))
+        return levels
+    
+    def rotated(self, source):
+        """Pyramid for the image turned 90 degrees clockwise (source is the rotated original)"""
+        return ImagePyramid(source, self.levels[0].transpose(Image.ROTATE_270), self.format)
+    
+    def turned(self, degrees):
+        """Pyramid turned clockwise by a multiple of 90 degrees, like the GUI's Rotate button"""
+        pyramid = self
+        for _ in range(degrees // 90 % 4):
+            pyramid = pyramid.rotated(pyramid.source.rotate(-90, expand=True))
+        return pyramid
+    
+    def get(self, bw_mode, size, full_res=False):
+        """Image with the B&W filter applied (if enabled), stretched to size"""
+        key = (bool(bw_mode), tuple(size), bool(full_res))
+        with self._lock:
+            img = self._cache.get(key)
+            if img is not None:
+                self._cache.move_to_end(key)
+                return img
+        
+        # Resized outside the lock, so a print-size resize on a generation thread doesn't
+        # hold up previews (two threads racing for the same size just both resize it)
+        w, h = size
+        src = self.source
+        if full_res:
+            with self._load_lock:
+                src.load()  # Decoding a lazily opened file isn't safe from two threads at once
+        else:
+            for level in reversed(self.levels):
+                if level.width >= w and level.height >= h:
+                    src = level
+                    break
+        img = get_processed_image(src, bw_mode).resize((w, h), Image.LANCZOS)
+        
+        with self._lock:
+            self._cache[key] = img
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return img
+
+
+class GenerationCancelled(Exception):
+    """Raised when a run is stopped through its cancel event (nothing is written)"""
+
+
+def save_output(save, output):
+    """Run save() to write output, deleting the file if writing fails part way"""
+    try:
+        save()
+    except BaseException:
+        if os.path.exists(output):
+            os.remove(output)
+        raise
+
+
+class GenerationStats:
+    """Where the time of one generation went, plus counters
+    
+    Phases: image (decode, B&W filter, resize, composite), template (the forms drawn on
+    every ticket or page, including compressing the image into the PDF), csv (reading
+    rows), names (splitting rows, swap/hide options), fit (auto-fit), draw, save and
+    merge (sharded runs). Phases are exclusive: while a nested one runs, such as csv
+    reading pulled from inside drawing, the outer one is paused. A sharded run sums
+    its workers' phases, so they can add up to more than wall_seconds.
+    
+    Counters: attendees, tickets, pages, strings_drawn, string_widths (width
+    measurements, including the one reportlab makes to centre each string) and
+    small_names (names auto-fit below MIN_READABLE_PT).
+    """
+    
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.wall_seconds = 0.0
+        self._started = time.perf_counter()
+        self._stack = []  # [phase, time it (re)started]
+    
+    def start(self, phase):
+        now = time.perf_counter()
+        if self._stack:
+            outer = self._stack[-1]
+            self.phases[outer[0]] = self.phases.get(outer[0], 0.0) + now - outer[1]
+        self._stack.append([phase, now])
+    
+    def stop(self):
+        now = time.perf_counter()
+        phase, since = self._stack.pop()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - since
+        if self._stack:
+            self._stack[-1][1] = now
+    
+    @contextmanager
+    def phase(self, phase):
+        self.start(phase)
+        try:
+            yield
+        finally:
+            self.stop()
+    
+    def timed(self, items, phase):
+        """Iterate items, counting the time spent producing each one towards phase"""
+        items = iter(items)
+        while True:
+            self.start(phase)
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                self.stop()
+            yield item
+    
+    def count(self, counter, n=1):
+        self.counters[counter] = self.counters.get(counter, 0) + n
+    
+    def add(self, other):
+        """Add the phases and counters of another run's to_dict() (e.g. a shard's)"""
+        for phase, seconds in other["phases"].items():
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        for counter, n in other["counters"].items():
+            self.count(counter, n)
+    
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self._started
+        return self
+    
+    def to_dict(self):
+        return {"wall_seconds": round(self.wall_seconds, 4),
+                "phases": {phase: round(seconds, 4) for phase, seconds in self.phases.items()},
+                "counters": dict(self.counters)}
+    
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    def summary(self):
+        """A few lines for a status dialog"""
+        phases = sorted(self.phases.items(), key=lambda item: -item[1])
+        lines = [f"Done in {self.wall_seconds:.2f}s: " +
+                 ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in phases[:4])]
+        lines.append(f"{self.counters.get('strings_drawn', 0):,} strings drawn, "
+                     f"{self.counters.get('string_widths', 0):,} widths measured")
+        return "\n".join(lines)
+
+
+def stats_path_for(output):
+    """JSON sidecar path for a PDF's stats: tickets.pdf -> tickets.stats.json"""
+    return os.path.splitext(output)[0] + ".stats.json"
+
+
+class CountingCanvas(canvas.Canvas):
+    """Canvas that counts drawn strings and width measurements into a GenerationStats"""
+    
+    def __init__(self, *args, stats, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+    
+    def drawString(self, *args, **kwargs):
+        self.stats.count("strings_drawn")
+        return super().drawString(*args, **kwargs)
+    
+    def drawCentredString(self, *args, **kwargs):
+        # reportlab measures the string to centre it
+        self.stats.count("strings_drawn")
+        self.stats.count("string_widths")
+        return super().drawCentredString(*args, **kwargs)
+    
+    def stringWidth(self, *args, **kwargs):
+        self.stats.count("string_widths")
+        return super().stringWidth(*args, **kwargs)
+
+
+PROFILE_MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), "ticket_profiles")
+
+
+class SamplingProfiler:
+    """Low-overhead profiler: a background thread looks at one thread's stack every
+    interval seconds and counts how often each call stack is seen
+    
+    write() saves the counts as collapsed stacks ("outer;inner;leaf count" lines), the
+    input format of flamegraph.pl and speedscope.
+    """
+    
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread = None
+        self._stop = threading.Event()
+    
+    def start(self, thread_id=None):
+        target = thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.sample, args=(target,), daemon=True,
+                                        name="ticket-sampler")
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+    
+    def sample(self, target):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+    
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profile:
+    """cProfile and/or sampling profile of one named operation, over one or more calls"""
+    
+    def __init__(self, name, modes):
+        self.name = name
+        self.cprofile = cProfile.Profile() if "cprofile" in modes else None
+        self.sampler = SamplingProfiler() if "sample" in modes else None
+        self.calls = 0
+    
+    def __enter__(self):
+        self.calls += 1
+        if self.cprofile is not None:
+            try:
+                self.cprofile.enable()
+            except ValueError:
+                # Python 3.12+ allows one cProfile at a time, e.g. preview vs generation thread
+                self.cprofile = None
+        if self.sampler is not None:
+            self.sampler.start()
+        return self
+    
+    def __exit__(self, *exc):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+    
+    def write(self, out_dir):
+        """Save name_<time>_<pid>_<n>.pstats / .collapsed.txt and return the paths"""
+        os.makedirs(out_dir, exist_ok=True)
+        with _profiling_lock:
+            _profiling["written"] += 1
+            base = os.path.join(out_dir, f"{self.name}_{time.strftime('%Y%m%d-%H%M%S')}_"
+                                         f"{os.getpid()}_{_profiling['written']}")
+        paths = []
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(base + ".pstats")
+            paths.append(base + ".pstats")
+        if self.sampler is not None and self.sampler.stacks:
+            self.sampler.write(base + ".collapsed.txt")
+            paths.append(base + ".collapsed.txt")
+        return paths
+
+
+def parse_profile_modes(value):
+    """Profile modes from a switch value: cprofile, sample, both/all/1, or empty for off"""
+    value = (value or "").strip().lower()
+    if value in ("", "0", "off", "no", "false"):
+        return frozenset()
+    if value in ("1", "on", "yes", "true", "all", "both"):
+        return frozenset(PROFILE_MODES)
+    modes = frozenset(mode.strip() for mode in value.split(","))
+    unknown = modes - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile mode(s): {', '.join(sorted(unknown))}")
+    return modes
+
+
+def env_profile_modes():
+    """Profile modes from TICKET_PROFILE; a bad value only warns (profiling stays off), so
+    it can't stop the GUI or the command line from starting"""
+    try:
+        return parse_profile_modes(os.environ.get("TICKET_PROFILE"))
+    except ValueError as e:
+        print(f"Ignoring TICKET_PROFILE: {e} (expected {', '.join(PROFILE_MODES)} or all)",
+              file=sys.stderr)
+        return frozenset()
+
+
+# Profiling switch: on at startup with TICKET_PROFILE=cprofile|sample|all (files go to
+# TICKET_PROFILE_DIR), or through set_profiling() from the GUI / --profile
+_profiling = {"modes": env_profile_modes(),
+              "dir": os.environ.get("TICKET_PROFILE_DIR") or PROFILE_DIR,
+              "open": {}, "written": 0}
+_profiling_lock = threading.Lock()
+_profiling_local = threading.local()
+
+
+def profiling_enabled():
+    return bool(_profiling["modes"])
+
+
+def profile_dir():
+    return _profiling["dir"]
+
+
+def set_profiling(modes, out_dir=None):
+    """Switch profiling on (modes from PROFILE_MODES) or off (empty), first saving any
+    accumulated profiles; returns the paths written"""
+    paths = flush_profiles()
+    _profiling["modes"] = frozenset(modes or ())
+    if out_dir:
+        _profiling["dir"] = out_dir
+    return paths
+
+
+def flush_profiles():
+    """Save the profiles accumulated over many calls (e.g. preview renders)"""
+    with _profiling_lock:
+        open_profiles = list(_profiling["open"].values())
+        _profiling["open"].clear()
+    paths = []
+    for profile in open_profiles:
+        paths.extend(profile.write(_profiling["dir"]))
+    return paths
+
+
+def profiled(name, accumulate=False):
+    """Decorator: profile calls while profiling is switched on
+    
+    Each call is saved as its own profile, unless accumulate is set (for small calls
+    made all the time, like preview renders); those add up until flush_profiles().
+    Calls nested in a profiled call on the same thread are part of the outer profile.
+    """
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            modes = _profiling["modes"]
+            if not modes or getattr(_profiling_local, "active", False):
+                return func(*args, **kwargs)
+            if accumulate:
+                with _profiling_lock:
+                    profile = _profiling["open"].get(name)
+                    if profile is None:
+                        profile = _profiling["open"][name] = Profile(name, modes)
+            else:
+                profile = Profile(name, modes)
+            _profiling_local.active = True
+            try:
+                with profile:
+                    return func(*args, **kwargs)
+            finally:
+                _profiling_local.active = False
+                if not accumulate:
+                    profile.write(_profiling["dir"])
+        return wrapper
+    return decorate
+
+
+MIN_SHARD_PAGES = 25  # Smaller shards cost more in process startup than they save
+SHARD_POLL_SECONDS = 0.2  # How often a parallel run passes on progress and checks for cancel
+
+
+def encode_jpeg(img, quality=JPEG_QUALITY):
+    buf = BytesIO()
+    img.save(buf, "JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def original_jpeg(image):
+    """Bytes of the JPEG file image was opened from, or None if there is no such file
+    (rotated and filtered copies have none) or it can't be embedded as-is"""
+    path = getattr(image, "filename", None)
+    if image.format != "JPEG" or image.mode not in ("RGB", "L") or not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        # The file may have been replaced since the image was opened
+        if Image.open(BytesIO(data)).size != image.size:
+            return None
+    except OSError:
+        return None
+    return data
+
+
+# Set in each process pool worker of a parallel run by init_shard_worker
+_shard_pages = None  # Queue the worker posts a 1 to for every page it finishes
+_shard_cancel = None  # Event the parent sets to stop the running shards
+
+
+def init_shard_worker(pages, cancel):
+    global _shard_pages, _shard_cancel
+    _shard_pages, _shard_cancel = pages, cancel
+
+
+def render_shard(job):
+    """Process pool worker: render one page-aligned slice of the attendee list"""
+    settings, ticket_img, attendees, offset, start, stop, total_attendees, output = job
+    if isinstance(attendees, str):
+        # Stream the shard's rows straight from the CSV, starting at its first row
+        attendees = islice(iter_attendees(attendees, offset=offset), stop - start)
+    pages = _shard_pages
+    progress = None if pages is None else (lambda done, total: pages.put(1))
+    renderer = TicketRenderer(settings, ticket_img, attendees, first_attendee=start,
+                              total_attendees=total_attendees, progress=progress, cancel=_shard_cancel)
+    stats = renderer.create_pdf(output)
+    return output, stats.to_dict()
+
+
+def merge_pdfs(paths, output):
+    """Concatenate PDFs into one document (requires pypdf)
+    
+    Every shard embeds its own copy of the ticket image and static form; identical
+    objects are merged before writing so the result is about as big as a serial run's.
+    """
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    writer.compress_identical_objects()
+    
+    def save():
+        with open(output, 'wb') as f:
+            writer.write(f)
+    
+    save_output(save, output)
+
+
+class TicketRenderer:
+    """Renders ticket PDFs from a settings object, a ticket image and attendees
+    
+    image is a path, a PIL image or an ImagePyramid (whose cache is then reused), or
+    the bytes of a JPEG that is embedded exactly as given (see embedded_image).
+    attendees is either the path of an attendee CSV, which is streamed row by row
+    while the pages are drawn, or an iterable of (first, last) records.
+    
+    first_attendee/total_attendees describe where these attendees sit in a larger run,
+    so a shard rendered on its own still numbers sequential counters (and zero-pads
+    them) exactly like the full document would.
+    
+    progress(pages_done, total_pages) is called as pages are finished. Setting the
+    cancel event (anything with is_set()) stops the run with GenerationCancelled.
+    create_pdf() and create_blanks_pdf() return the run's GenerationStats.
+    """
+    
+    def __init__(self, settings, image, attendees=None, first_attendee=0, total_attendees=None,
+                 progress=None, cancel=None):
+        self.settings = settings
+        self.ticket_image = Image.open(image) if isinstance(image, str) else image
+        self.attendees = attendees if attendees is not None else []
+        self.first_attendee = first_attendee
+        self._total_attendees = total_attendees
+        self._attendee_count = None
+        self.page_offsets = None  # Byte offset in the CSV where each page cycle's attendees start
+        self.progress = progress
+        self.cancel = cancel
+    
+    @property
+    def attendee_count(self):
+        """Number of attendees this renderer draws"""
+        if self._attendee_count is None:
+            if isinstance(self.attendees, str):
+                _, cycle_attendees = self.settings.page_cycle()
+                self.page_offsets = []
+                self._attendee_count = count_attendees(self.attendees, self.page_offsets, cycle_attendees)
+            elif hasattr(self.attendees, '__len__'):
+                self._attendee_count = len(self.attendees)
+            elif self._total_attendees is not None:
+                self._attendee_count = self._total_attendees - self.first_attendee
+            else:
+                raise ValueError("total_attendees is required when attendees is an iterator")
+        return self._attendee_count
+    
+    @property
+    def total_attendees(self):
+        """Number of attendees in the whole run (sets the sequential counter padding)"""
+        if self._total_attendees is None:
+            return self.first_attendee + self.attendee_count
+        return self._total_attendees
+    
+    def iter_names(self, stats=None):
+        """Yield the (first, last) lines to print, with swap/hide options applied"""
+        if isinstance(self.attendees, str):
+            records = iter_attendees(self.attendees, stats)
+        else:
+            records = self.attendees
+        swap, hide_last = self.settings.swap_names, self.settings.hide_last_name
+        if swap or hide_last:
+            records = (apply_name_options(first, last, swap, hide_last) for first, last in records)
+        if stats is not None:
+            return stats.timed(records, "names")
+        return iter(records)
+    
+    def check_cancelled(self):
+        if self.cancel is not None and self.cancel.is_set():
+            raise GenerationCancelled()
+    
+    def report_progress(self, pages_done, total_pages):
+        """Stop here if cancelled, otherwise pass the page count on to the progress callback"""
+        self.check_cancelled()
+        if self.progress is not None:
+            self.progress(pages_done, total_pages)
+    
+    def calculate_total_pages(self):
+        count = self.attendee_count
+        if not count:
+            return 0
+        return self.settings.page_count(count)
+    
+    def embedded_image_size(self):
+        """Pixel size of the embedded image: print_dpi across the ticket, but never more
+        pixels than the source has (the image is stretched, so each axis is capped on its own)"""
+        ticket_w, ticket_h = self.settings.ticket_size
+        dpi = self.settings.print_dpi
+        iw, ih = int(ticket_w * dpi / inch), int(ticket_h * dpi / inch)
+        if isinstance(self.ticket_image, ImagePyramid):
+            src_w, src_h = self.ticket_image.source.size
+        else:
+            src_w, src_h = self.ticket_image.size
+        return max(1, min(iw, src_w)), max(1, min(ih, src_h))
+    
+    def prepare_ticket_image(self):
+        """Stretch the (B&W filtered) image to the embedded size and composite onto white
+        (a grayscale canvas in B&W mode)"""
+        iw, ih = self.embedded_image_size()
+        if isinstance(self.ticket_image, ImagePyramid):
+            stretched = self.ticket_image.get(self.settings.bw_mode, (iw, ih), full_res=True)
+        else:
+            processed_img = get_processed_image(self.ticket_image, self.settings.bw_mode)
+            stretched = processed_img.resize((iw, ih), Image.LANCZOS)
+        ticket_img = Image.new('L' if self.settings.bw_mode else 'RGB', (iw, ih), 'white')
+        if stretched.mode in ('RGBA', 'LA'):
+            ticket_img.paste(stretched, (0, 0), stretched)
+        else:
+            ticket_img.paste(stretched, (0, 0))
+        return ticket_img
+    
+    def embedded_image(self):
+        """The ticket image for ImageReader: a PIL image (embedded with Flate) or the bytes
+        of a JPEG (embedded as-is with DCTDecode), whichever comes out smaller
+        
+        Only JPEG artwork, which is lossy to begin with, may stay JPEG: one re-encode at the
+        embedded size, or its own file when that is embedded unchanged (not rotated, and the
+        B&W filter leaves the pixels alone).
+        """
+        if isinstance(self.ticket_image, bytes):
+            return self.ticket_image
+        ticket_img = self.prepare_ticket_image()
+        if isinstance(self.ticket_image, ImagePyramid):
+            source, source_format = self.ticket_image.source, self.ticket_image.format
+        else:
+            source, source_format = self.ticket_image, self.ticket_image.format
+        if self.settings.image_encoding == "flate" or source_format != "JPEG":
+            return ticket_img
+        # reportlab compresses the raw pixels with zlib's default level, just like this.
+        # A rotated source has no file of its own, so original_jpeg gives None for it.
+        candidates = [(len(zlib.compress(ticket_img.tobytes())), ticket_img)]
+        reencoded = encode_jpeg(ticket_img)
+        candidates.append((len(reencoded), reencoded))
+        original = None if self.settings.bw_mode else original_jpeg(source)
+        if original is not None:
+            candidates.append((len(original), original))
+        return min(candidates, key=lambda candidate: candidate[0])[1]
+    
+    @staticmethod
+    def image_reader(image):
+        return ImageReader(BytesIO(image) if isinstance(image, bytes) else image)
+    
+    @profiled("create_pdf")
+    def create_pdf(self, output, workers=1):
+        """Render the ticket PDF; workers > 1 shards large runs across a process pool"""
+        if workers != 1:
+            return self.create_pdf_parallel(output, workers)
+        
+        s = self.settings
+        stats = GenerationStats()
+        page_w, page_h = s.page_size
+        ticket_w, ticket_h = s.ticket_size
+        cols, rows, att_per_page, rows_per_att = s.grid()
+        tpa = s.tickets_per_attendee
+        
+        gw, gh = cols * ticket_w, rows * ticket_h
+        
+        if s.align_top_left:
+            ox, oy = 0, 0
+        else:
+            ox, oy = (page_w - gw) / 2, (page_h - gh) / 2
+        
+        # Prepare image - stretch to fill exact dimensions, composite onto white.
+        # Handed to reportlab straight from memory (no temp file to encode, reread or clash on).
+        with stats.phase("image"):
+            img_reader = self.image_reader(self.embedded_image())
+        
+        c = CountingCanvas(output, pagesize=(page_w, page_h), stats=stats)
+        
+        # Background image and title are identical on every ticket: draw them once
+        with stats.phase("template"):
+            static_form = begin_ticket_form(c, s, "ticket_static")
+            c.drawImage(img_reader, 0, 0, width=ticket_w, height=ticket_h, mask='auto')
+            draw_title(c, s, 0, 0)
+            c.endForm()
+        
+        # With name_forms, an outlined name block (fitted font, outline, underline) is drawn
+        # once as a form that all of that attendee's tickets share. That shrinks the page
+        # content a lot, but the form objects cost more file size than they save at the
+        # GUI's 1-10 tickets per attendee, so it is off unless asked for. A plain name is
+        # only a couple of text operators and never gets a form.
+        def name_form_for(attendee, first, last, name_size):
+            if not s.name_forms or not s.name_outline:
+                return None
+            form = begin_ticket_form(c, s, f"name_{attendee}")
+            draw_name(c, s, 0, 0, first, last, name_size)
+            c.endForm()
+            return form
+        
+        def draw_ticket(x, y, first, last, name_size, name_form, counter_num=None):
+            """Helper to draw a single ticket at position x, y"""
+            place_form(c, static_form, x, y)
+            
+            # Name - First above Last (name_size is already auto-fit)
+            if name_form:
+                place_form(c, name_form, x, y)
+            else:
+                draw_name(c, s, x, y, first, last, name_size)
+            
+            # Counter number
+            if counter_num is not None and s.counter_enabled:
+                draw_counter(c, s, x, y, counter_num)
+        
+        # Calculate max sequential number for zero-padding
+        max_sequential = self.total_attendees * tpa
+        num_digits = len(str(max_sequential))
+        
+        # Attendees are pulled from the stream one page (or page cycle, see page_cycle)
+        # at a time, with their name sizes auto-fit in bulk a chunk of attendees ahead
+        stats.start("draw")
+        names = iter_fitted_names(s, self.iter_names(stats), stats=stats)
+        sequential_counter = self.first_attendee * tpa  # For sequential mode
+        _, cycle_attendees = s.page_cycle()
+        slots = cols * rows
+        page_names = list(islice(names, cycle_attendees))
+        page_start = self.first_attendee  # Index of the page's first attendee
+        total_pages = self.calculate_total_pages() if self.progress else None
+        pages_done = 0
+        
+        def finish_page():
+            nonlocal pages_done
+            draw_cutting_guides(c, s, cols, rows, ox, oy)
+            pages_done += 1
+            stats.count("pages")
+            self.report_progress(pages_done, total_pages)
+        
+        while page_names:
+            page_forms = [name_form_for(page_start + i, *name) for i, name in enumerate(page_names)]
+            
+            if s.batch_mode:
+                # Batch mode ON: group tickets by attendee
+                for page_att, (first, last, name_size) in enumerate(page_names):
+                    name_form = page_forms[page_att]
+                    start_row = page_att * rows_per_att
+                    count = 0
+                    
+                    for row_off in range(rows_per_att):
+                        if count >= tpa:
+                            break
+                        for col in range(cols):
+                            if count >= tpa:
+                                break
+                            
+                            row = start_row + row_off
+                            x = ox + col * ticket_w
+                            y = page_h - oy - (row + 1) * ticket_h
+                            
+                            # Determine counter number with zero-padding for sequential
+                            if s.counter_mode == "Per Attendee":
+                                counter_num = str(count + 1)
+                            else:  # Sequential
+                                sequential_counter += 1
+                                counter_num = str(sequential_counter).zfill(num_digits)
+                            
+                            draw_ticket(x, y, first, last, name_size, name_form, counter_num)
+                            count += 1
+            else:
+                # Batch mode OFF: fill the page row by row, tpa tickets per attendee. Tickets
+                # that don't fit on the page carry over to the next one.
+                for slot in range(len(page_names) * tpa):
+                    if slot and slot % slots == 0:
+                        finish_page()
+                        c.showPage()
+                    first, last, name_size = page_names[slot // tpa]
+                    name_form = page_forms[slot // tpa]
+                    ticket_for_attendee = slot % tpa
+                    row, col = divmod(slot % slots, cols)
+                    x = ox + col * ticket_w
+                    y = page_h - oy - (row + 1) * ticket_h
+                    
+                    # Determine counter number with zero-padding for sequential
+                    if s.counter_mode == "Per Attendee":
+                        counter_num = str(ticket_for_attendee + 1)
+                    else:  # Sequential
+                        sequential_counter += 1
+                        counter_num = str(sequential_counter).zfill(num_digits)
+                    
+                    draw_ticket(x, y, first, last, name_size, name_form, counter_num)
+            
+            stats.count("attendees", len(page_names))
+            stats.count("tickets", len(page_names) * tpa)
+            if s.auto_fit_names:
+                stats.count("small_names", sum(1 for _, _, name_size in page_names if name_size < MIN_READABLE_PT))
+            finish_page()
+            page_start += len(page_names)
+            page_names = list(islice(names, cycle_attendees))
+            if page_names:
+                c.showPage()
+        stats.stop()
+        
+        with stats.phase("save"):
+            save_output(c.save, output)
+        return stats.finish()
+    
+    def create_pdf_parallel(self, output, workers=None):
+        """Split the attendee list into page-aligned shards, render them in a process
+        pool and stitch the partial PDFs together
+        
+        Falls back to a single process when pypdf is missing or the run is too small
+        to be worth sharding. Workers post every finished page back, so progress moves
+        page by page and cancelling also stops the shards that are already running.
+        """
+        workers = workers or os.cpu_count() or 1
+        stats = GenerationStats()
+        cycle_pages, cycle_attendees = self.settings.page_cycle()
+        total_pages = self.calculate_total_pages()
+        pages_per_shard = max(MIN_SHARD_PAGES, math.ceil(total_pages / workers))
+        if not HAS_PYPDF or workers < 2 or total_pages <= pages_per_shard:
+            return self.create_pdf(output)
+        
+        # Every page cycle holds exactly cycle_attendees attendees, so shards of whole
+        # cycles concatenate into the same document a single process would produce
+        cycles_per_shard = math.ceil(pages_per_shard / cycle_pages)
+        shard_size = cycles_per_shard * cycle_attendees
+        with stats.phase("image"):
+            ticket_img = self.embedded_image()  # Workers get the small, ready-to-embed image
+        if isinstance(self.attendees, str):
+            source = self.attendees  # Each worker streams its own rows, seeking straight to them
+        else:
+            source = list(self.attendees)
+        out_dir = os.path.dirname(os.path.abspath(output))
+        with tempfile.TemporaryDirectory(prefix="tickets_", dir=out_dir) as tmp:
+            jobs = []
+            for n, start in enumerate(range(0, self.attendee_count, shard_size)):
+                stop = min(start + shard_size, self.attendee_count)
+                if isinstance(source, str):
+                    shard, offset = source, self.page_offsets[start // cycle_attendees]
+                else:
+                    shard, offset = source[start:stop], 0
+                jobs.append((self.settings, ticket_img, shard, offset, start, stop, self.total_attendees,
+                             os.path.join(tmp, f"shard_{n:04d}.pdf")))
+            # Wait on the shards a slice of time at a time so progress and cancel stay live
+            pages = multiprocessing.Queue() if self.progress else None
+            cancel = multiprocessing.Event()
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                       initializer=init_shard_worker, initargs=(pages, cancel))
+            try:
+                futures = [pool.submit(render_shard, job) for job in jobs]
+                pending = set(futures)
+                pages_done = 0
+                while pending:
+                    self.check_cancelled()
+                    done, pending = wait(pending, timeout=SHARD_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stats.add(future.result()[1])  # Also re-raises a worker's error
+                    if pages is not None:
+                        finished = 0
+                        try:
+                            while True:
+                                finished += pages.get_nowait()
+                        except Empty:
+                            pass
+                        if finished:
+                            pages_done = min(pages_done + finished, total_pages)
+                            self.report_progress(pages_done, total_pages)
+            except BaseException:
+                cancel.set()  # Cancelled or a shard failed: stop the others at their next page
+                raise
+            finally:
+                # Shards not yet started are dropped; running ones finish into the temp dir
+                pool.shutdown(wait=True, cancel_futures=True)
+            self.report_progress(total_pages, total_pages)  # Pages posted after the last poll
+            with stats.phase("merge"):
+                merge_pdfs([future.result()[0] for future in futures], output)
+        return stats.finish()
+    
+    @profiled("create_blanks_pdf")
+    def create_blanks_pdf(self, output):
+        """Generate PDF with blank tickets (no names, just extra text if provided)"""
+        s = self.settings
+        stats = GenerationStats()
+        page_w, page_h = s.page_size
+        ticket_w, ticket_h = s.ticket_size
+        cols, rows, _, _ = s.grid()
+        pages = s.blank_pages
+        
+        gw, gh = cols * ticket_w, rows * ticket_h
+        
+        if s.align_top_left:
+            ox, oy = 0, 0
+        else:
+            ox, oy = (page_w - gw) / 2, (page_h - gh) / 2
+        
+        # Prepare image (in memory, like create_pdf)
+        with stats.phase("image"):
+            img_reader = self.image_reader(self.embedded_image())
+        
+        c = CountingCanvas(output, pagesize=(page_w, page_h), stats=stats)
+        
+        extra_text = s.extra_text.strip()
+        
+        # Extra text (single line, uses "name/extra" settings) is the same on every ticket
+        with stats.phase("fit"):
+            extra_size = fit_name_size(s, extra_text, "", stats)
+        
+        def draw_blank_ticket(x, y):
+            """Draw the static part of a single blank ticket at position x, y"""
+            c.drawImage(img_reader, x, y, width=ticket_w, height=ticket_h, mask='auto')
+            
+            draw_title(c, s, x, y)
+            
+            if extra_text:
+                c.setFont(s.name_font, extra_size)
+                
+                extra_x = x + s.name_dx
+                extra_y = y + s.name_dy - extra_size * 0.35
+                
+                if s.name_outline:
+                    draw_text_outline(c, extra_x, extra_y, extra_text)
+                
+                set_fill(c, s.name_fill)
+                c.drawCentredString(extra_x, extra_y, extra_text)
+                
+                if s.name_underline:
+                    extra_width = c.stringWidth(extra_text, s.name_font, extra_size)
+                    set_stroke(c, s.name_fill)
+                    c.setLineWidth(1)
+                    c.line(extra_x - extra_width/2, extra_y - 2, extra_x + extra_width/2, extra_y - 2)
+        
+        # Every page is identical apart from the counters: build the whole page once as a
+        # form and reference it from each page, stamping only the counter numbers on top
+        with stats.phase("template"):
+            c.beginForm("blank_page")
+            for row in range(rows):
+                for col in range(cols):
+                    draw_blank_ticket(ox + col * ticket_w, page_h - oy - (row + 1) * ticket_h)
+            draw_cutting_guides(c, s, cols, rows, ox, oy)
+            c.endForm()
+        
+        # Get counter settings for blanks mode
+        if s.counter_mode == "Per Attendee":
+            # Cycle 1 to repeat_count
+            repeat_count = max(1, s.counter_repeat)
+            num_digits = len(str(repeat_count))
+        else:  # Sequential
+            # Start from start_num
+            start_num = max(1, s.counter_start)
+            max_sequential = start_num + (pages * rows * cols) - 1
+            num_digits = len(str(max_sequential))
+        
+        # Generate all pages
+        stats.start("draw")
+        sequential_counter = 0
+        for page in range(pages):
+            if page > 0:
+                c.showPage()
+            
+            c.doForm("blank_page")
+            if s.counter_enabled:
+                for row in range(rows):
+                    for col in range(cols):
+                        x = ox + col * ticket_w
+                        y = page_h - oy - (row + 1) * ticket_h
+                        sequential_counter += 1
+                        
+                        if s.counter_mode == "Per Attendee":
+                            # Cycle 1 to repeat_count
+                            counter_num = ((sequential_counter - 1) % repeat_count) + 1
+                            counter_str = str(counter_num)
+                        else:  # Sequential
+                            counter_num = start_num + sequential_counter - 1
+                            counter_str = str(counter_num).zfill(num_digits)
+                        
+                        draw_counter(c, s, x, y, counter_str)
+            
+            stats.count("pages")
+            stats.count("tickets", rows * cols)
+            self.report_progress(page + 1, pages)
+        stats.stop()
+        
+        with stats.phase("save"):
+            save_output(c.save, output)
+        return stats.finish()
+
+
+def render_output(renderer, output, blanks=False, workers=1):
+    """Write the ticket (or blanks) PDF for renderer and return its GenerationStats"""
+    if blanks:
+        return renderer.create_blanks_pdf(output)
+    return renderer.create_pdf(output, workers)
+
+
+def generate(output, settings, image, csv_path=None, blanks=False, workers=1):
+    """One-call API: render a ticket (or blanks) PDF and return the page count"""
+    renderer = TicketRenderer(settings, image, None if blanks else csv_path)
+    return render_output(renderer, output, blanks, workers).counters.get("pages", 0)
+
+
+JOB_WORKERS = 2  # Jobs a JobQueue renders at the same time
+JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_CANCELLED, JOB_FAILED = (
+    "Queued", "Running", "Done", "Cancelled", "Failed")
+
+
+@dataclass(eq=False)
+class GenerationJob:
+    """One queued PDF generation and how far it has got
+    
+    image is a path (turned by image_rotation degrees when loaded) or an ImagePyramid,
+    e.g. an image already rotated in the GUI. The status fields are only written by the
+    thread running the job.
+    """
+    settings: TicketSettings
+    image: object
+    output: str
+    csv_path: str = None
+    blanks: bool = False
+    name: str = ""
+    workers: int = 1
+    image_rotation: int = 0
+    
+    status: str = JOB_QUEUED
+    pages_done: int = 0
+    total_pages: int = 0
+    tickets: int = 0
+    error: str = ""
+    stats: GenerationStats = None
+    cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    
+    @property
+    def finished(self):
+        return self.status in (JOB_DONE, JOB_CANCELLED, JOB_FAILED)
+
+
+class JobQueue:
+    """Runs GenerationJobs on a small thread pool
+    
+    Jobs naming the same image file share one decoded ImagePyramid, so the image is
+    decoded, filtered and resized once rather than per job. Font metrics and width
+    tables are module-level caches and are shared anyway.
+    """
+    
+    def __init__(self, workers=JOB_WORKERS):
+        self.jobs = []
+        self._futures = []
+        self._images = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ticket-job")
+    
+    def image_for(self, image, rotation=0):
+        """Shared pyramid for an image path (keyed by path, modification time and rotation)"""
+        if not isinstance(image, str):
+            return image
+        path = os.path.abspath(image)
+        key = (path, os.path.getmtime(path))
+        rotation %= 360
+        with self._lock:
+            pyramid = self._images.get(key + (rotation,))
+            if pyramid is None:
+                if key + (0,) not in self._images:
+                    self._images[key + (0,)] = ImagePyramid.open(path)
+                pyramid = self._images[key + (0,)].turned(rotation)
+                self._images[key + (rotation,)] = pyramid
+            return pyramid
+    
+    def submit(self, job):
+        """Queue a job; raises ValueError if an unfinished job already writes its output"""
+        with self._lock:
+            target = os.path.abspath(job.output)
+            if any(os.path.abspath(other.output) == target and not other.finished for other in self.jobs):
+                raise ValueError(f"Another queued job already writes {job.output}")
+            self.jobs.append(job)
+            self._futures.append(self._pool.submit(self.run, job))
+        return job
+    
+    def finished_jobs(self):
+        """Yield the submitted jobs as they finish (blocks until all are done)"""
+        with self._lock:
+            futures = list(self._futures)
+        for future in as_completed(futures):
+            yield future.result()
+    
+    def run(self, job):
+        with self._lock:
+            if job.status != JOB_QUEUED:
+                return job  # Cancelled while waiting
+            job.status = JOB_RUNNING
+        
+        def progress(done, total):
+            job.pages_done, job.total_pages = done, total
+        
+        try:
+            renderer = TicketRenderer(job.settings, self.image_for(job.image, job.image_rotation),
+                                      None if job.blanks else job.csv_path,
+                                      progress=progress, cancel=job.cancel)
+            job.stats = render_output(renderer, job.output, job.blanks, job.workers)
+            job.tickets = job.stats.counters.get("tickets", 0)
+            job.pages_done = job.total_pages = job.stats.counters.get("pages", 0)
+            job.status = JOB_DONE
+        except GenerationCancelled:
+            job.status = JOB_CANCELLED
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.status = JOB_FAILED
+        return job
+    
+    def cancel(self, job):
+        """Stop a job (a running one ends at its next page, without writing its PDF)"""
+        with self._lock:
+            job.cancel.set()
+            if job.status == JOB_QUEUED:
+                job.status = JOB_CANCELLED
+    
+    def clear_finished(self):
+        with self._lock:
+            self.jobs = [job for job in self.jobs if not job.finished]
+    
+    def active(self):
+        return any(not job.finished for job in self.jobs)
+    
+    def shutdown(self):
+        """Cancel everything and let the worker threads exit"""
+        for job in list(self.jobs):
+            self.cancel(job)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def load_settings(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return TicketSettings.from_dict(json.load(f))
+
+
+JOB_SPEC_VERSION = 1
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """Everything needed to replay a generation: files, mode, image rotation and settings
+    
+    Saved as JSON by save_job_specs(). Relative paths in a spec file are resolved
+    against the file's folder.
+    """
+    image: str
+    csv: str = None
+    output: str = None
+    blanks: bool = False
+    image_rotation: int = 0  # Degrees clockwise, as turned with the GUI's Rotate button
+    name: str = ""
+    settings: TicketSettings = field(default_factory=TicketSettings)
+    
+    def __post_init__(self):
+        if not self.image:
+            raise ValueError("job spec needs an image")
+        if not self.blanks and not self.csv:
+            raise ValueError("job spec needs a csv unless blanks is true")
+        if self.image_rotation not in ROTATIONS:
+            raise ValueError(f"image_rotation must be one of {ROTATIONS}, got {self.image_rotation!r}")
+    
+    @classmethod
+    def from_dict(cls, data, base_dir=""):
+        data = dict(data)
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown job field(s): {', '.join(sorted(unknown))}")
+        data["settings"] = TicketSettings.from_dict(data.get("settings", {}))
+        for key in ("image", "csv", "output"):
+            if data.get(key):
+                data[key] = os.path.join(base_dir, data[key])
+        data["blanks"] = bool(data.get("blanks", False))
+        data["image_rotation"] = int(data.get("image_rotation", 0))
+        return cls(**data)
+    
+    def to_dict(self):
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["settings"] = self.settings.to_dict()
+        return data
+    
+    def to_job(self, workers=1):
+        return GenerationJob(self.settings, self.image, self.output, self.csv, self.blanks,
+                             name=self.name, workers=workers, image_rotation=self.image_rotation)
+
+
+def load_job_specs(path):
+    """Read a job spec file: one spec object, or {"version": 1, "jobs": [spec, ...]}
+    
+    Specs without an output write <spec file name>.pdf (numbered for several jobs)
+    next to the spec file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if "jobs" in data:
+        if data.get("version", JOB_SPEC_VERSION) > JOB_SPEC_VERSION:
+            raise ValueError(f"{path} needs a newer version of the ticket maker")
+        entries = data["jobs"]
+    else:
+        entries = [data]
+    
+    base_dir = os.path.dirname(os.path.abspath(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    specs = []
+    for i, entry in enumerate(entries, 1):
+        spec = JobSpec.from_dict(entry, base_dir)
+        if not spec.output:
+            suffix = f"-{i}" if len(entries) > 1 else ""
+            spec = replace(spec, output=os.path.join(base_dir, f"{stem}{suffix}.pdf"))
+        if not spec.name:
+            spec = replace(spec, name=os.path.splitext(os.path.basename(spec.output))[0])
+        specs.append(spec)
+    return specs
+
+
+def save_job_specs(path, specs):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"version": JOB_SPEC_VERSION, "jobs": [spec.to_dict() for spec in specs]}, f, indent=2)
+
+
+def run_job_specs(specs, workers=1, jobs_at_once=JOB_WORKERS):
+    """Run specs on one JobQueue, so specs using the same image decode and process it
+    once, and yield each GenerationJob as it finishes"""
+    queue = JobQueue(jobs_at_once)
+    try:
+        for spec in specs:
+            queue.submit(spec.to_job(workers))
+        yield from queue.finished_jobs()
+    finally:
+        queue.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate ticket PDFs without the GUI")
+    parser.add_argument("--csv", help="attendee CSV (column A = last name, column B = first name)")
+    parser.add_argument("--image", help="ticket background image")
+    parser.add_argument("-o", "--output", help="output PDF path")
+    parser.add_argument("--settings", help="JSON file with TicketSettings fields")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a single setting (repeatable)")
+    parser.add_argument("--blanks", action="store_true", help="generate blank tickets (no CSV needed)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="render large runs in N processes (0 = one per CPU, needs pypdf)")
+    parser.add_argument("--jobs", nargs="+", metavar="SPEC",
+                        help="run the jobs in these spec files (saved from the app) instead")
+    parser.add_argument("--stats", action="store_true",
+                        help="write phase timings and counters next to each PDF (name.stats.json)")
+    parser.add_argument("--profile", metavar="MODE",
+                        help="profile the run: cprofile, sample or all (also TICKET_PROFILE=...)")
+    parser.add_argument("--profile-dir", help=f"where profiles are written (default {PROFILE_DIR})")
+    args = parser.parse_args(argv)
+    
+    if args.profile or args.profile_dir:
+        try:
+            modes = parse_profile_modes(args.profile) if args.profile else _profiling["modes"]
+        except ValueError as e:
+            parser.error(str(e))
+        set_profiling(modes, args.profile_dir)
+    if profiling_enabled():
+        print(f"Profiling ({', '.join(sorted(_profiling['modes']))}) to {profile_dir()}")
+    
+    if args.jobs:
+        specs = [spec for path in args.jobs for spec in load_job_specs(path)]
+        failed = 0
+        for job in run_job_specs(specs, args.workers):
+            if job.status == JOB_DONE:
+                print(f"Created {job.output} ({job.total_pages} pages)")
+                if args.stats:
+                    job.stats.save(stats_path_for(job.output))
+            else:
+                failed += 1
+                print(f"{job.status}: {job.name} ({job.error or job.output})", file=sys.stderr)
+        return 1 if failed else 0
+    
+    if not args.image or not args.output:
+        parser.error("--image and --output are required unless --jobs is given")
+    if not args.blanks and not args.csv:
+        parser.error("--csv is required unless --blanks is given")
+    
+    settings = load_settings(args.settings) if args.settings else TicketSettings()
+    overrides = {}
+    for item in args.set:
+        key, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--set expects KEY=VALUE, got {item!r}")
+        overrides[key.strip()] = value
+    if overrides:
+        settings = settings.updated(overrides)
+    
+    renderer = TicketRenderer(settings, args.image, None if args.blanks else args.csv)
+    stats = render_output(renderer, args.output, args.blanks, args.workers)
+    print(f"Created {args.output} ({stats.counters.get('pages', 0)} pages)")
+    if args.stats:
+        stats.save(stats_path_for(args.output))
+        print(stats.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,20 +5,27 @@ GUI app with live preview for creating personalized drink tickets.
 Repository: https://github.com/riconanci/TicketGen
 """
 
-import csv
 import os
 import sys
-import math
+import multiprocessing
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, colorchooser
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from PIL import Image, ImageTk, ImageDraw, ImageFont
-from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib.units import inch
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
 import traceback
+from collections import deque
+from functools import lru_cache
+from ticket_engine import (COUNTER_RED, DEFAULT_PRINT_DPI, JOB_DONE, MIN_READABLE_PT, PRINT_DPI_OPTIONS, PROFILE_MODES,
+                           GenerationCancelled, GenerationJob, JobQueue, JobSpec, TicketSettings, TicketRenderer,
+                           ImagePyramid, apply_name_options, calculate_grid,
+                           count_attendees, count_pages, fit_font_size, flush_profiles, get_page_dimensions, gray_level, hex_to_rgb,
+                           iter_attendees, load_job_specs, profile_dir, profiled, profiling_enabled, render_output,
+                           save_job_specs, set_profiling)
 
 # Try to import drag and drop support
 try:
@@ -27,6 +34,114 @@ try:
 except ImportError:
     HAS_DND = False
 
+PREVIEW_FRAME_MS = 16  # Shortest gap between scheduled preview renders (~60 fps)
+GENERATION_POLL_MS = 100  # How often the UI picks up progress from the generation thread
+STALL_THRESHOLD_MS = 250  # The watchdog logs any Tk callback that blocks the event loop longer than this
+HEARTBEAT_MS = 50  # How often the Tk thread checks in with the watchdog
+PREVIEW_TIMES_KEPT = 50  # Preview renders averaged in the diagnostics overlay
+
+# TicketSettings fields kept in plain attributes (picked colors, dragged positions, rotation)
+SETTINGS_ATTRS = ("title_color", "title_x_pos", "title_y_pos", "name_color", "name_x_pos", "name_y_pos",
+                  "counter_x_pos", "counter_y_pos", "counter_rotation", "image_encoding")
+
+# Font faces as candidate files, first one that loads wins (Windows name, then Linux)
+PREVIEW_FONT = ("arial.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+PREVIEW_BOLD_FONT = ("arialbd.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf")
+LABEL_FONT = ("arial.ttf",)
+
+
+@lru_cache(maxsize=None)
+def resolve_font_file(face):
+    """Find the first font file of a face that PIL can load (None if there is none)"""
+    for font_file in face:
+        try:
+            ImageFont.truetype(font_file, 10)
+            return font_file
+        except OSError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=256)
+def load_font(face, size):
+    """Get a PIL font, cached by (face, size) so repeated measuring never touches the disk"""
+    font_file = resolve_font_file(face)
+    if font_file is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(font_file, size)
+
+
+def format_duration(seconds):
+    """Short duration for the ETA, e.g. 45s or 3m 05s"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    return f"{seconds // 60}m {seconds % 60:02d}s"
+
+
+class StallWatchdog:
+    """Logs the Tk thread's stack whenever the event loop stops turning for too long
+    
+    The Tk thread bumps a heartbeat from an after() loop; a daemon thread checks its age
+    and, once it passes the threshold, logs where the Tk thread is stuck. Stalls go to
+    stderr and to ui_stalls.log in the profile folder.
+    """
+    
+    def __init__(self, root, threshold_ms=STALL_THRESHOLD_MS):
+        self.root = root
+        self.threshold = threshold_ms / 1000
+        self.tk_thread = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stalls = 0
+        self.stopped = None  # Event of the running watch thread, None when stopped
+        self.beat_id = None
+    
+    def start(self):
+        if self.stopped is not None:
+            return
+        self.stopped = threading.Event()
+        self.beat()
+        threading.Thread(target=self.watch, args=(self.stopped,), name="ui-watchdog", daemon=True).start()
+    
+    def stop(self):
+        if self.stopped is None:
+            return
+        self.stopped.set()
+        self.stopped = None
+        self.root.after_cancel(self.beat_id)
+        self.beat_id = None
+    
+    def beat(self):
+        self.last_beat = time.monotonic()
+        self.beat_id = self.root.after(HEARTBEAT_MS, self.beat)
+    
+    def watch(self, stopped):
+        stalled_since = None
+        while not stopped.wait(HEARTBEAT_MS / 1000):
+            last_beat = self.last_beat
+            age = time.monotonic() - last_beat
+            if age > self.threshold and stalled_since is None:
+                # Log once per stall, with the stack at the moment it crossed the threshold
+                stalled_since = last_beat
+                self.stalls += 1
+                frame = sys._current_frames().get(self.tk_thread)
+                stack = "".join(traceback.format_stack(frame)) if frame else "  (stack unavailable)\n"
+                self.log(f"UI blocked for {age * 1000:.0f} ms so far, Tk thread is in:\n{stack}")
+            elif stalled_since is not None and last_beat != stalled_since:
+                self.log(f"UI stall ended after {(last_beat - stalled_since) * 1000 - HEARTBEAT_MS:.0f} ms\n")
+                stalled_since = None
+    
+    def log(self, message):
+        line = f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}"
+        print(line, end="", file=sys.stderr)
+        try:
+            out_dir = profile_dir()
+            os.makedirs(out_dir, exist_ok=True)
+            with open(os.path.join(out_dir, "ui_stalls.log"), "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            print(f"Could not write stall log: {e}", file=sys.stderr)
+
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and PyInstaller"""
@@ -47,9 +162,12 @@ class TicketGeneratorApp:
         # Variables
         self.csv_path = None
         self.image_path = None
-        self.attendees = []
+        self.attendee_count = 0  # Rows in the CSV (names are streamed from disk when generating)
+        self.sample_attendee = None  # First (first, last) record, shown in the preview
         self.ticket_image = None
+        self.image_pyramid = None  # Preview-sized copies and processed image cache
         self.image_aspect_ratio = 1.71  # Default ratio
+        self.image_rotation = 0  # Degrees the image was turned with the Rotate button
         
         # Blanks mode
         self.blanks_mode = tk.IntVar(value=0)
@@ -81,8 +199,12 @@ class TicketGeneratorApp:
         self.tickets_per_attendee_var = tk.StringVar(value="5")
         self.align_top_left_var = tk.IntVar(value=1)
         self.batch_mode_var = tk.IntVar(value=0)  # Group tickets by attendee (default off)
+        self.name_forms_var = tk.IntVar(value=0)  # Outlined names drawn once per attendee (smaller pages, bigger file)
         self.cutting_guides_var = tk.IntVar(value=1)  # Dotted cutting lines (default on)
         self.bw_mode_var = tk.IntVar(value=0)  # Black and white mode (default off)
+        self.print_dpi_var = tk.StringVar(value=str(DEFAULT_PRINT_DPI))  # Embedded image resolution
+        self.image_encoding = "auto"  # No widget, but kept when a job spec is loaded and saved again
+        self.all_cores_var = tk.IntVar(value=1)  # Shard big runs across every CPU core
         
         # Preview mode
         self.preview_mode = tk.StringVar(value="ticket")
@@ -116,6 +238,21 @@ class TicketGeneratorApp:
         self.preview_offset_y = 0
         self.preview_offset_x = 0
         
+        # Preview scheduling (renders are coalesced to at most one per frame)
+        self.preview_pending = None  # after() id of the queued render
+        self.preview_layers = {}  # Cached ticket preview layers: name -> (key, photo, anchor, box)
+        self.preview_render_ms = 0.0  # Smoothed time of recent renders
+        self.preview_times = deque(maxlen=PREVIEW_TIMES_KEPT)  # Recent render times (ms) for the overlay
+        
+        # Diagnostics overlay + stall watchdog (Ctrl+Shift+D)
+        self.diagnostics = False
+        self.watchdog = StallWatchdog(self.root)
+        
+        # Background PDF generation (None when idle, see start_generation)
+        self.generation = None
+        self.job_queue = None  # Created with the first queued job (see enqueue_job)
+        self.jobs_polling = False
+        
         # Bounding boxes for click detection (in canvas coordinates)
         self.title_bbox = None  # (x1, y1, x2, y2)
         self.name_bbox = None
@@ -139,11 +276,14 @@ class TicketGeneratorApp:
         self.help_btn.pack(side=tk.RIGHT, padx=(0, 5))
         self.blanks_btn = ttk.Button(about_row, text="Blanks", command=self.toggle_blanks_mode, bootstyle="warning-outline")
         self.blanks_btn.pack(side=tk.RIGHT, padx=(0, 5))
+        self.jobs_btn = ttk.Button(about_row, text="Queue", command=self.show_jobs, bootstyle="primary-outline")
+        self.jobs_btn.pack(side=tk.RIGHT, padx=(0, 5))
         
         # Track about, help, and donate windows
         self.about_window = None
         self.help_window = None
         self.donate_window = None
+        self.jobs_window = None
         
         # Start donate button glow animation
         self.donate_glow_state = 0
@@ -191,13 +331,13 @@ class TicketGeneratorApp:
         # Repeat field (for blanks + Per Attendee): "Repeat 1-[X]"
         self.counter_repeat_label = ttk.Label(counter_row, text="1-")
         self.counter_repeat_entry = ttk.Entry(counter_row, textvariable=self.counter_repeat_var, width=4)
-        self.counter_repeat_entry.bind('<KeyRelease>', lambda e: self.update_preview())
+        self.counter_repeat_entry.bind('<KeyRelease>', lambda e: self.schedule_preview())
         # Not packed by default - shown only in blanks mode + Per Attendee
         
         # Start field (for blanks + Sequential): "Start:"
         self.counter_start_label = ttk.Label(counter_row, text="Start:")
         self.counter_start_entry = ttk.Entry(counter_row, textvariable=self.counter_start_var, width=5)
-        self.counter_start_entry.bind('<KeyRelease>', lambda e: self.update_preview())
+        self.counter_start_entry.bind('<KeyRelease>', lambda e: self.schedule_preview())
         # Not packed by default - shown only in blanks mode + Sequential
         
         ttk.Label(counter_row, text="Size:").pack(side=tk.LEFT, padx=(5, 2))
@@ -471,6 +611,12 @@ class TicketGeneratorApp:
         self.batch_check.pack(side=tk.LEFT)
         self.batch_check.bind('<Button-1>', lambda e: self.set_preview_mode("layout"))
         
+        # Outlined names as one shared PDF form per attendee: lighter pages for slow printers,
+        # at the cost of a somewhat bigger file
+        self.name_forms_check = ttk.Checkbutton(self.batch_row, text="Reuse outlined names",
+                                                 variable=self.name_forms_var, bootstyle="primary")
+        self.name_forms_check.pack(side=tk.RIGHT)
+        
         # Cutting guides row
         cutting_row = ttk.Frame(layout_frame)
         cutting_row.pack(fill=tk.X, pady=2)
@@ -481,6 +627,12 @@ class TicketGeneratorApp:
         self.cutting_check.pack(side=tk.LEFT)
         self.cutting_check.bind('<Button-1>', lambda e: self.set_preview_mode("layout"))
         
+        # Image resolution in the PDF: lower for quick drafts, higher for final prints
+        self.print_dpi_combo = ttk.Combobox(cutting_row, textvariable=self.print_dpi_var,
+                                             values=[str(dpi) for dpi in PRINT_DPI_OPTIONS], width=4, state="readonly")
+        self.print_dpi_combo.pack(side=tk.RIGHT)
+        ttk.Label(cutting_row, text="Image DPI:").pack(side=tk.RIGHT, padx=(5, 2))
+        
         # === GENERATE ===
         generate_frame = ttk.Frame(main_frame)
         generate_frame.pack(fill=tk.X, pady=6)
@@ -490,6 +642,20 @@ class TicketGeneratorApp:
         self.generate_btn.pack(ipady=6)
         self.generate_btn.configure(state="disabled")
         
+        job_row = ttk.Frame(generate_frame)
+        job_row.pack()
+        ttk.Button(job_row, text="Load Job...", command=self.load_job, bootstyle="secondary-link").pack(side=tk.LEFT)
+        self.queue_btn = ttk.Button(job_row, text="+ Add to Queue", command=self.enqueue_job,
+                                     bootstyle="secondary-link")
+        self.queue_btn.pack(side=tk.LEFT)
+        self.queue_btn.configure(state="disabled")
+        self.save_job_btn = ttk.Button(job_row, text="Save Job...", command=self.save_job,
+                                        bootstyle="secondary-link")
+        self.save_job_btn.pack(side=tk.LEFT)
+        self.save_job_btn.configure(state="disabled")
+        ttk.Checkbutton(job_row, text="All CPU cores", variable=self.all_cores_var,
+                        bootstyle="secondary").pack(side=tk.LEFT, padx=(8, 0))
+        
         # Configure button font using style
         style = ttk.Style()
         style.configure("danger.TButton", font=("Segoe UI", 12, "bold"))
@@ -498,8 +664,18 @@ class TicketGeneratorApp:
                                        foreground="gray", font=("Segoe UI", 11))
         self.status_label.pack(pady=(6, 10))
         
+        # Shown above the status only while a PDF is being generated
+        self.progress_bar = ttk.Progressbar(generate_frame, mode="determinate", length=300,
+                                            bootstyle="danger-striped")
+        
         # Close popups when clicking anywhere on main window
         self.root.bind("<Button-1>", self.on_main_window_click, add="+")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Diagnostics: Ctrl+Shift+P toggles profiling of previews and PDF generation
+        self.root.bind("<Control-P>", lambda e: self.toggle_profiling())
+        # Ctrl+Shift+D shows preview render times and logs UI stalls
+        self.root.bind("<Control-D>", lambda e: self.toggle_diagnostics())
     
     def on_main_window_click(self, event):
         """Close any open popups when clicking on the main window"""
@@ -516,7 +692,7 @@ class TicketGeneratorApp:
     
     def on_step2_interact(self):
         self.set_preview_mode("ticket")
-        self.update_preview()
+        self.schedule_preview()
     
     def close_all_popups(self, except_window=None):
         """Close all popup windows (About, Help, Donate) except the specified one"""
@@ -774,11 +950,13 @@ In Blanks mode:
    - Sequential: Enter a starting number (e.g., "101" = 101,102,103...)\n\n""", "body")
         
         text.insert(tk.END, "Tips\n", "heading")
-        text.insert(tk.END, """• Use B&W checkbox to convert your ticket image to grayscale
+        text.insert(tk.END, """• Use B&W checkbox to print the whole ticket (image and text) in grayscale — smaller PDFs for laser printers
 • The Page Layout preview shows exactly how tickets fit on the page
 • Ticket counts update automatically when you change settings
 • Font sizes go up to 50 for large text on bigger tickets
-• Click "Generate PDF" when ready — you'll choose where to save it""", "tip")
+• Click "Generate PDF" when ready — you'll choose where to save it
+• Slow? Press Ctrl+Shift+P, repeat what was slow, then press it again — attach the files it saves to your bug report
+• Ctrl+Shift+D shows how long previews take and logs any moment the window freezes""", "tip")
         
         # Make text read-only
         text.configure(state=tk.DISABLED)
@@ -1011,6 +1189,8 @@ In Blanks mode:
         
         # Rotate the image 90 degrees clockwise
         self.ticket_image = self.ticket_image.rotate(-90, expand=True)
+        self.image_pyramid = self.image_pyramid.rotated(self.ticket_image)
+        self.image_rotation = (self.image_rotation + 90) % 360
         self.image_aspect_ratio = self.ticket_image.width / self.ticket_image.height
         
         # Auto-fit to new aspect ratio
@@ -1059,23 +1239,22 @@ In Blanks mode:
         """Called when black & white checkbox changed"""
         self.update_preview()
     
-    def get_processed_image(self):
-        """Get the ticket image with B&W filter applied if enabled"""
-        if not self.ticket_image:
-            return None
-        
-        img = self.ticket_image.copy()
-        if self.bw_mode_var.get():
-            # Convert to grayscale, then back to RGB/RGBA for compatibility
-            if img.mode == 'RGBA':
-                # Preserve alpha channel
-                r, g, b, a = img.split()
-                gray = img.convert('L')
-                img = Image.merge('RGBA', (gray, gray, gray, a))
-            else:
-                gray = img.convert('L')
-                img = Image.merge('RGB', (gray, gray, gray))
-        return img
+    def print_color(self, hex_color):
+        """Text color as it will print: B&W mode turns text gray as well"""
+        if not self.bw_mode_var.get():
+            return hex_color
+        return "#" + f"{gray_level(hex_color):02x}" * 3
+    
+    def get_stretched_image(self, w, h):
+        """Get the ticket image at w x h with B&W filter applied if enabled"""
+        return self.image_pyramid.get(self.bw_mode_var.get(), (w, h))
+    
+    def load_ticket_image(self, path):
+        """Open the ticket image and build its preview pyramid"""
+        self.image_pyramid = ImagePyramid.open(path)
+        self.ticket_image = self.image_pyramid.source
+        self.image_rotation = 0
+        self.image_aspect_ratio = self.ticket_image.width / self.ticket_image.height
     
     def pick_title_color(self):
         self.set_preview_mode("ticket")
@@ -1100,8 +1279,7 @@ In Blanks mode:
             self.update_preview()
     
     def hex_to_rgb(self, hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        return hex_to_rgb(hex_color)
     
     def on_canvas_click(self, event):
         if self.preview_mode.get() != "ticket" or not self.ticket_image:
@@ -1185,7 +1363,8 @@ In Blanks mode:
                 new_pos_x = max(-0.45, min(0.45, self.drag_start_pos_x + delta_x))
                 self.counter_x_pos = new_pos_x
         
-        self.update_preview()
+        # Only positions changed, so just move the cached sprites
+        self.place_preview_sprites()
     
     def on_canvas_release(self, event):
         self.dragging = None
@@ -1199,7 +1378,7 @@ In Blanks mode:
         else:
             self.ticket_btn.configure(bootstyle="dark")
             self.layout_btn.configure(bootstyle="primary")
-        self.update_preview()
+        self.schedule_preview()
     
     def update_valid_sizes(self):
         page_w, page_h = self.get_page_dimensions()
@@ -1227,39 +1406,20 @@ In Blanks mode:
             pass
         
     def get_page_dimensions(self):
-        if self.orientation_var.get() == "Landscape":
-            return landscape(letter)
-        return letter
+        return get_page_dimensions(self.orientation_var.get())
     
     def get_ticket_dimensions(self):
         return float(self.ticket_width_var.get()) * inch, float(self.ticket_height_var.get()) * inch
     
     def calculate_grid(self):
-        page_w, page_h = self.get_page_dimensions()
-        ticket_w, ticket_h = self.get_ticket_dimensions()
-        
-        cols = max(1, int(page_w // ticket_w))
-        rows = max(1, int(page_h // ticket_h))
-        
-        tpa = int(self.tickets_per_attendee_var.get())
-        
-        if self.batch_mode_var.get():
-            # Batch mode ON: group tickets by attendee in rows
-            rows_per_att = math.ceil(tpa / cols)
-            att_per_page = max(1, rows // rows_per_att)
-        else:
-            # Batch mode OFF: fill entire page, attendees not grouped
-            total_slots = cols * rows
-            att_per_page = max(1, total_slots // tpa)
-            rows_per_att = math.ceil(tpa / cols)  # Still needed for some calculations
-        
-        return cols, rows, att_per_page, rows_per_att
+        return calculate_grid(self.get_page_dimensions(), self.get_ticket_dimensions(),
+                              int(self.tickets_per_attendee_var.get()), self.batch_mode_var.get())
     
     def calculate_total_pages(self):
-        if not self.attendees:
+        if not self.attendee_count:
             return 0
-        cols, rows, att_per_page, rows_per_att = self.calculate_grid()
-        return math.ceil(len(self.attendees) / att_per_page)
+        return count_pages(self.attendee_count, self.calculate_grid(),
+                           int(self.tickets_per_attendee_var.get()), self.batch_mode_var.get())
     
     def update_calc_display(self):
         cols, rows, att_per_page, rows_per_att = self.calculate_grid()
@@ -1279,10 +1439,10 @@ In Blanks mode:
             total_pages = self.calculate_total_pages()
             self.layout_info_label.configure(text=f"Ticket: {tw}\" × {th}\"  |  {tpa} per person")
             
-            if self.attendees:
+            if self.attendee_count:
                 self.attendee_info_label.configure(text=f"({att_per_page}/page, {total_pages} pages)")
                 self.calc_info_label.configure(
-                    text=f"{len(self.attendees)} attendees × {tpa} = {len(self.attendees)*tpa} tickets ({total_pages} pages)"
+                    text=f"{self.attendee_count} attendees × {tpa} = {self.attendee_count*tpa} tickets ({total_pages} pages)"
                 )
             else:
                 self.attendee_info_label.configure(text=f"({att_per_page} attendee(s) per page)")
@@ -1340,9 +1500,9 @@ In Blanks mode:
             if ext == '.csv':
                 # Load as CSV
                 self.csv_path = path
-                self.attendees = self.read_attendees(path)
+                self.load_attendees(path)
                 self.csv_btn.configure(text="Remove CSV", bootstyle="danger-outline")
-                self.csv_label.configure(text=f"{os.path.basename(path)[:15]} ({len(self.attendees)} attendees)", foreground="")
+                self.csv_label.configure(text=f"{os.path.basename(path)[:15]} ({self.attendee_count} attendees)", foreground="")
                 self.check_ready()
                 self.update_preview()
                 
@@ -1351,8 +1511,7 @@ In Blanks mode:
                 try:
                     self.image_path = path
                     self.img_label.configure(text=os.path.basename(path)[:20], foreground="")
-                    self.ticket_image = Image.open(path)
-                    self.image_aspect_ratio = self.ticket_image.width / self.ticket_image.height
+                    self.load_ticket_image(path)
                     self.auto_fit_to_image()
                     self.check_ready()
                     self.update_preview()
@@ -1364,7 +1523,8 @@ In Blanks mode:
         if self.csv_path:
             # Remove CSV
             self.csv_path = None
-            self.attendees = []
+            self.attendee_count = 0
+            self.sample_attendee = None
             self.csv_btn.configure(text="Select CSV", bootstyle="success-outline")
             self.csv_label.configure(text="No file", foreground="gray")
             self.check_ready()
@@ -1375,9 +1535,9 @@ In Blanks mode:
         path = filedialog.askopenfilename(title="Select CSV", filetypes=[("CSV", "*.csv"), ("All", "*.*")])
         if path:
             self.csv_path = path
-            self.attendees = self.read_attendees(path)
+            self.load_attendees(path)
             self.csv_btn.configure(text="Remove CSV", bootstyle="danger-outline")
-            self.csv_label.configure(text=f"{os.path.basename(path)[:15]} ({len(self.attendees)} attendees)", foreground="")
+            self.csv_label.configure(text=f"{os.path.basename(path)[:15]} ({self.attendee_count} attendees)", foreground="")
             self.check_ready()
             self.update_preview()
             
@@ -1386,8 +1546,7 @@ In Blanks mode:
         if path:
             self.image_path = path
             self.img_label.configure(text=os.path.basename(path)[:20], foreground="")
-            self.ticket_image = Image.open(path)
-            self.image_aspect_ratio = self.ticket_image.width / self.ticket_image.height
+            self.load_ticket_image(path)
             # Auto-fit to image ratio on load
             self.auto_fit_to_image()
             self.check_ready()
@@ -1426,6 +1585,15 @@ In Blanks mode:
             self.update_valid_sizes()
             
     def check_ready(self):
+        if self.blanks_mode.get():
+            ready = bool(self.image_path)
+        else:
+            ready = bool(self.csv_path and self.image_path and self.attendee_count)
+        self.queue_btn.configure(state="normal" if ready else "disabled")
+        self.save_job_btn.configure(state="normal" if ready else "disabled")
+        
+        if self.generation:
+            return  # Button and status show the running generation
         if self.blanks_mode.get():
             # Blanks mode: only need image
             if self.image_path:
@@ -1436,53 +1604,147 @@ In Blanks mode:
                 self.status_label.configure(text="Select an image to get started", foreground="gray")
         else:
             # Normal mode: need CSV and image
-            if self.csv_path and self.image_path and self.attendees:
+            if self.csv_path and self.image_path and self.attendee_count:
                 self.generate_btn.configure(state="normal")
                 self.status_label.configure(text="✓ Ready!", foreground="#28a745")
             else:
                 self.generate_btn.configure(state="disabled")
                 self.status_label.configure(text="Select CSV and image to get started", foreground="gray")
             
-    def read_attendees(self, path):
-        attendees = []
+    def load_attendees(self, path):
+        """Count the CSV rows and keep only the first name for the preview"""
         try:
-            with open(path, 'r', encoding='utf-8-sig') as f:
-                for row in csv.reader(f):
-                    if row and row[0].strip():
-                        name = f"{row[0].strip()}, {row[1].strip()}" if len(row) >= 2 and row[1].strip() else row[0].strip()
-                        attendees.append(name)
+            self.attendee_count = count_attendees(path)
+            self.sample_attendee = next(iter_attendees(path), None)
         except Exception as e:
             messagebox.showerror("Error", f"Could not read CSV:\n{e}")
-        return attendees
+            self.attendee_count = 0
+            self.sample_attendee = None
+    
+    def apply_name_options(self, first, last):
+        return apply_name_options(first, last, self.swap_names_var.get(), self.hide_last_name_var.get())
+    
+    def settings_vars(self):
+        """Tk variable behind each TicketSettings field that lives in a widget"""
+        return {
+            "title": self.title_var,
+            "title_font_size": self.title_font_size_var,
+            "title_bold": self.title_bold_var,
+            "title_outline": self.title_outline_var,
+            "title_underline": self.title_underline_var,
+            "name_font_size": self.name_font_size_var,
+            "name_bold": self.name_bold_var,
+            "name_outline": self.name_outline_var,
+            "name_underline": self.name_underline_var,
+            "swap_names": self.swap_names_var,
+            "hide_last_name": self.hide_last_name_var,
+            "auto_fit_names": self.auto_fit_names_var,
+            "center_lock": self.center_lock_var,
+            "orientation": self.orientation_var,
+            "ticket_width": self.ticket_width_var,
+            "ticket_height": self.ticket_height_var,
+            "tickets_per_attendee": self.tickets_per_attendee_var,
+            "align_top_left": self.align_top_left_var,
+            "batch_mode": self.batch_mode_var,
+            "name_forms": self.name_forms_var,
+            "cutting_guides": self.cutting_guides_var,
+            "bw_mode": self.bw_mode_var,
+            "print_dpi": self.print_dpi_var,
+            "counter_enabled": self.counter_enabled_var,
+            "counter_mode": self.counter_mode_var,
+            "counter_size": self.counter_size_var,
+            "counter_color": self.counter_color_var,
+            "extra_text": self.extra_text_var,
+            "blank_pages": self.blank_pages_var,
+            "counter_repeat": self.counter_repeat_var,
+            "counter_start": self.counter_start_var,
+        }
+    
+    def get_settings(self):
+        """Collect the current GUI state into a TicketSettings for the rendering engine"""
+        data = {name: var.get() for name, var in self.settings_vars().items()}
+        data.update((name, getattr(self, name)) for name in SETTINGS_ATTRS)
+        data["counter_repeat"] = self.get_int(self.counter_repeat_var, 5)
+        data["counter_start"] = self.get_int(self.counter_start_var, 1)
+        return TicketSettings.from_dict(data)
+    
+    def apply_settings(self, settings):
+        """Show a TicketSettings in the widgets (e.g. from a loaded job spec)"""
+        for name, var in self.settings_vars().items():
+            value = getattr(settings, name)
+            if isinstance(value, bool):
+                value = int(value)
+            elif isinstance(value, float):
+                value = f"{value:g}"  # 3.0 -> "3", matching the combobox values
+            var.set(value)
+        for name in SETTINGS_ATTRS:
+            setattr(self, name, getattr(settings, name))
+        
+        self.title_color_canvas.delete("all")
+        self.title_color_canvas.create_rectangle(0, 0, 29, 23, fill=self.title_color, outline="")
+        self.name_color_canvas.delete("all")
+        self.name_color_canvas.create_rectangle(0, 0, 29, 23, fill=self.name_color, outline="")
+        self.update_counter_fields()
+        self.update_valid_sizes()
+    
+    def get_int(self, var, default):
+        """Read an integer entry, falling back to a default for empty/invalid text"""
+        try:
+            return int(var.get())
+        except ValueError:
+            return default
+    
+    def schedule_preview(self):
+        """Queue a preview render; requests made before it runs collapse into one"""
+        if self.preview_pending is not None:
+            return
+        # Wait at least one frame, longer if renders are slow on this machine
+        delay = max(PREVIEW_FRAME_MS, int(self.preview_render_ms))
+        self.preview_pending = self.root.after(delay, self.run_scheduled_preview)
+    
+    def run_scheduled_preview(self):
+        self.preview_pending = None
+        self.update_preview()
     
-    def parse_name(self, full_name):
-        if ',' in full_name:
-            parts = full_name.split(',', 1)
-            first = parts[1].strip() if len(parts) > 1 else ""
-            last = parts[0].strip()
-        else:
-            first = full_name.strip()
-            last = ""
-        
-        # Swap if checkbox is checked
-        if self.swap_names_var.get():
-            first, last = last, first
-        
-        # Hide last name if checkbox is checked
-        if self.hide_last_name_var.get():
-            last = ""
-        
-        return first, last
-            
     def update_preview(self):
+        # Renders right away, so any queued render would be redundant
+        if self.preview_pending is not None:
+            self.root.after_cancel(self.preview_pending)
+            self.preview_pending = None
         self.update_calc_display()
         self.check_ready()
         if not self.ticket_image:
             return
+        start = time.perf_counter()
         if self.preview_mode.get() == "ticket":
             self.update_ticket_preview()
         else:
             self.update_layout_preview()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.preview_render_ms = 0.7 * self.preview_render_ms + 0.3 * elapsed_ms
+        self.preview_times.append(elapsed_ms)
+        if self.diagnostics:
+            self.draw_diagnostics()
+    
+    def draw_diagnostics(self):
+        """Draw the render-time overlay in the top-left corner of the preview"""
+        canvas = self.preview_canvas
+        canvas.delete("diagnostics")
+        if not self.diagnostics:
+            return
+        times = self.preview_times
+        if times:
+            text = (f"last {times[-1]:.1f} ms  avg {sum(times) / len(times):.1f} ms  "
+                    f"max {max(times):.1f} ms  ({len(times)} renders)")
+        else:
+            text = "no renders yet"
+        text += f"\nUI stalls > {STALL_THRESHOLD_MS} ms: {self.watchdog.stalls}"
+        label = canvas.create_text(6, 6, anchor=tk.NW, text=text, fill="#c00", font=("Consolas", 8),
+                                   tags="diagnostics")
+        x1, y1, x2, y2 = canvas.bbox(label)
+        backdrop = canvas.create_rectangle(x1-3, y1-2, x2+3, y2+2, fill="white", outline="#c00",
+                                           tags="diagnostics")
+        canvas.tag_lower(backdrop, label)
     
     def resize_image_to_fill(self, img, tw, th):
         """Resize image to exactly fill target dimensions (stretch to fit)"""
@@ -1490,12 +1752,9 @@ In Blanks mode:
     
     def draw_text_with_outline(self, draw, pos, text, font, fill_color, outline=False, underline=False):
         x, y = pos
-        if outline:
-            for dx in [-2, -1, 0, 1, 2]:
-                for dy in [-2, -1, 0, 1, 2]:
-                    if dx != 0 or dy != 0:
-                        draw.text((x + dx, y + dy), text, font=font, fill="white")
-        draw.text((x, y), text, font=font, fill=fill_color)
+        # Outline is PIL's own 2px white stroke, drawn under the fill in the same call
+        draw.text((x, y), text, font=font, fill=fill_color,
+                  stroke_width=2 if outline else 0, stroke_fill="white")
         
         if underline:
             bbox = draw.textbbox((x, y), text, font=font)
@@ -1504,33 +1763,22 @@ In Blanks mode:
     
     def get_preview_font(self, size, bold=False):
         """Get PIL font for preview"""
-        try:
-            font_file = "arialbd.ttf" if bold else "arial.ttf"
-            return ImageFont.truetype(font_file, size)
-        except:
-            # Try Linux fonts
-            if bold:
-                font_file = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-            else:
-                font_file = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
-            try:
-                return ImageFont.truetype(font_file, size)
-            except:
-                return ImageFont.load_default()
+        return load_font(PREVIEW_BOLD_FONT if bold else PREVIEW_FONT, size)
     
+    @profiled("preview_ticket", accumulate=True)
     def update_ticket_preview(self):
         if not self.ticket_image:
             return
         
         # In normal mode, don't show name preview if no CSV loaded
-        if not self.blanks_mode.get() and not self.attendees:
+        if not self.blanks_mode.get() and not self.sample_attendee:
             first, last = "", ""
         elif self.blanks_mode.get():
             # Blanks mode: use extra_text as single line (empty strings if not set)
             extra = self.extra_text_var.get().strip()
             first, last = extra, ""  # Extra text on first line, nothing on second
         else:
-            first, last = self.parse_name(self.attendees[0])
+            first, last = self.apply_name_options(*self.sample_attendee)
         
         try:
             
@@ -1550,256 +1798,64 @@ In Blanks mode:
             self.preview_offset_y = (canvas_h - ph) // 2
             self.preview_offset_x = (canvas_w - pw) // 2
             
-            # Reset bounding boxes
-            self.title_bbox = None
-            self.name_bbox = None
-            self.counter_bbox = None
-            
-            # Stretch image to fill entire ticket, composite onto white background (matches PDF)
-            processed_img = self.get_processed_image()
-            stretched = processed_img.resize((pw, ph), Image.LANCZOS)
-            ticket = Image.new('RGB', (pw, ph), '#FFFFFF')
-            if stretched.mode == 'RGBA':
-                ticket.paste(stretched, (0, 0), stretched)  # Use alpha as mask
-            else:
-                ticket.paste(stretched, (0, 0))
-            
-            draw = ImageDraw.Draw(ticket)
-            
             scale = min(pw / 216, ph / 126)
             
-            # Title font
-            title_size = max(8, int(int(self.title_font_size_var.get()) * scale * 1.8))
-            title_font = self.get_preview_font(title_size, self.title_bold_var.get())
-            
-            # Name font with auto-fit
-            name_size = max(10, int(int(self.name_font_size_var.get()) * scale * 1.8))
-            name_font = self.get_preview_font(name_size, self.name_bold_var.get())
-            
-            # Auto-fit: shrink font if names are too wide
-            if self.auto_fit_names_var.get() and (first or last):
-                max_width = int(pw * 0.85)  # 85% of ticket width
-                while name_size > 6:
-                    test_font = self.get_preview_font(name_size, self.name_bold_var.get())
-                    first_w = draw.textbbox((0, 0), first, font=test_font)[2] if first else 0
-                    last_w = draw.textbbox((0, 0), last, font=test_font)[2] if last else 0
-                    if max(first_w, last_w) <= max_width:
-                        break
-                    name_size -= 1
-                name_font = self.get_preview_font(name_size, self.name_bold_var.get())
+            # Each layer is re-rendered only when its own inputs change
+            self.set_preview_layer("background", (self.image_pyramid, pw, ph, self.bw_mode_var.get()),
+                                   lambda: self.render_background_layer(pw, ph))
             
-            cx, cy = pw // 2, ph // 2
-            
-            # Draw title
             title = self.title_var.get()
-            title_bottom = cy  # Track where title ends for name positioning
             if title.strip():
-                title_y_center = cy + int(self.title_y_pos * ph)
-                # Get bbox at origin to calculate dimensions
-                bbox = draw.textbbox((0, 0), title, font=title_font)
-                tw_text = bbox[2] - bbox[0]
-                th_text = bbox[3] - bbox[1]
-                # Position text - centered or offset based on lock
-                title_x_center = cx + (0 if self.center_lock_var.get() else int(self.title_x_pos * pw))
-                tx = title_x_center - tw_text // 2 - bbox[0]  # Adjust for left offset
-                ty = title_y_center - th_text // 2 - bbox[1]  # Adjust for top offset
-                self.draw_text_with_outline(draw, (tx, ty), title, title_font, 
-                                           self.title_color, self.title_outline_var.get(),
-                                           self.title_underline_var.get())
-                # Get actual bbox after positioning
-                actual_bbox = draw.textbbox((tx, ty), title, font=title_font)
-                draw.rectangle([actual_bbox[0] - 2, actual_bbox[1] - 2, 
-                               actual_bbox[2] + 2, actual_bbox[3] + 2], outline="#2196F3", width=2)
-                title_bottom = actual_bbox[3]
-                # Store bbox in canvas coordinates
-                self.title_bbox = (
-                    actual_bbox[0] - 2 + self.preview_offset_x,
-                    actual_bbox[1] - 2 + self.preview_offset_y,
-                    actual_bbox[2] + 2 + self.preview_offset_x,
-                    actual_bbox[3] + 2 + self.preview_offset_y
-                )
-            
-            # Draw name - First name on top, Last name below (or single line in blanks mode)
-            name_y_center = cy + int(self.name_y_pos * ph)
-            name_x_center = cx + (0 if self.center_lock_var.get() else int(self.name_x_pos * pw))
+                title_size = max(8, int(int(self.title_font_size_var.get()) * scale * 1.8))
+                key = (title, title_size, self.title_bold_var.get(), self.print_color(self.title_color),
+                       self.title_outline_var.get(), self.title_underline_var.get())
+                self.set_preview_layer("title", key, lambda: self.render_title_sprite(title, title_size))
+            else:
+                self.preview_layers.pop("title", None)
             
-            if first and not last:
-                # Single line mode (blanks mode with extra text)
-                first_bbox_0 = draw.textbbox((0, 0), first, font=name_font)
-                first_w = first_bbox_0[2] - first_bbox_0[0]
-                first_h = first_bbox_0[3] - first_bbox_0[1]
-                
-                first_x = name_x_center - first_w // 2 - first_bbox_0[0]
-                first_y = name_y_center - first_h // 2 - first_bbox_0[1]
-                self.draw_text_with_outline(draw, (first_x, first_y), first, name_font, 
-                                            self.name_color, self.name_outline_var.get(),
-                                            self.name_underline_var.get())
-                first_actual = draw.textbbox((first_x, first_y), first, font=name_font)
-                
-                # Draw box around single line
-                draw.rectangle([first_actual[0] - 2, first_actual[1] - 2, 
-                               first_actual[2] + 2, first_actual[3] + 2], outline="#4CAF50", width=2)
-                # Store bbox in canvas coordinates
-                self.name_bbox = (
-                    first_actual[0] - 2 + self.preview_offset_x,
-                    first_actual[1] - 2 + self.preview_offset_y,
-                    first_actual[2] + 2 + self.preview_offset_x,
-                    first_actual[3] + 2 + self.preview_offset_y
-                )
-            elif first or last:
-                # Two line mode (normal mode)
-                # Get dimensions for both names
-                first_bbox_0 = draw.textbbox((0, 0), first, font=name_font)
-                first_w = first_bbox_0[2] - first_bbox_0[0]
-                first_h = first_bbox_0[3] - first_bbox_0[1]
-                
-                last_bbox_0 = draw.textbbox((0, 0), last, font=name_font)
-                last_w = last_bbox_0[2] - last_bbox_0[0]
-                last_h = last_bbox_0[3] - last_bbox_0[1]
-                
-                # Total height with gap
+            if first or last:
+                name_size = max(10, int(int(self.name_font_size_var.get()) * scale * 1.8))
+                max_width = int(pw * 0.85)  # 85% of ticket width
                 line_gap = int(4 * scale)
-                total_name_height = first_h + line_gap + last_h
-                
-                # Position first name
-                first_x = name_x_center - first_w // 2 - first_bbox_0[0]
-                first_y = name_y_center - total_name_height // 2 - first_bbox_0[1]
-                self.draw_text_with_outline(draw, (first_x, first_y), first, name_font, 
-                                            self.name_color, self.name_outline_var.get(),
-                                            self.name_underline_var.get())
-                first_actual = draw.textbbox((first_x, first_y), first, font=name_font)
-                
-                # Position last name
-                last_x = name_x_center - last_w // 2 - last_bbox_0[0]
-                last_y = first_actual[3] + line_gap - last_bbox_0[1]
-                self.draw_text_with_outline(draw, (last_x, last_y), last, name_font, 
-                                            self.name_color, self.name_outline_var.get(),
-                                            self.name_underline_var.get())
-                last_actual = draw.textbbox((last_x, last_y), last, font=name_font)
-                
-                # Draw box around both name lines
-                box_left = min(first_actual[0], last_actual[0]) - 2
-                box_right = max(first_actual[2], last_actual[2]) + 2
-                draw.rectangle([box_left, first_actual[1] - 2, box_right, last_actual[3] + 2], outline="#4CAF50", width=2)
-                # Store bbox in canvas coordinates
-                self.name_bbox = (
-                    box_left + self.preview_offset_x,
-                    first_actual[1] - 2 + self.preview_offset_y,
-                    box_right + self.preview_offset_x,
-                    last_actual[3] + 2 + self.preview_offset_y
-                )
+                key = (first, last, name_size, max_width, line_gap, self.auto_fit_names_var.get(),
+                       self.name_bold_var.get(), self.print_color(self.name_color), self.name_outline_var.get(),
+                       self.name_underline_var.get())
+                self.set_preview_layer("name", key,
+                                       lambda: self.render_name_sprite(first, last, name_size, max_width, line_gap))
+            else:
+                self.preview_layers.pop("name", None)
             
-            # Draw counter box if enabled
             if self.counter_enabled_var.get():
                 counter_size = max(8, int(int(self.counter_size_var.get()) * scale * 1.8))
-                counter_font = self.get_preview_font(counter_size, bold=True)
-                
-                # Determine sample number based on mode
-                if self.blanks_mode.get():
-                    # Blanks mode
-                    if self.counter_mode_var.get() == "Per Attendee":
-                        try:
-                            max_num = max(1, int(self.counter_repeat_var.get()))
-                        except ValueError:
-                            max_num = 5
-                        sample_text = str(max_num)
-                    else:  # Sequential
-                        try:
-                            start_num = max(1, int(self.counter_start_var.get()))
-                        except ValueError:
-                            start_num = 1
-                        pages = int(self.blank_pages_var.get())
-                        cols, rows, _, _ = self.calculate_grid()
-                        max_num = start_num + (pages * rows * cols) - 1
-                        num_digits = len(str(max_num))
-                        sample_text = str(max_num).zfill(num_digits)
-                else:
-                    # Normal mode with attendees
-                    if self.counter_mode_var.get() == "Sequential":
-                        max_num = len(self.attendees) * int(self.tickets_per_attendee_var.get()) if self.attendees else 100
-                        # Zero-pad to match max number length
-                        num_digits = len(str(max_num))
-                        sample_text = str(max_num).zfill(num_digits)
-                    else:
-                        max_num = int(self.tickets_per_attendee_var.get())
-                        sample_text = str(max_num)
-                
-                # Get counter color
-                counter_color = "#C41E3A" if self.counter_color_var.get() == "Red" else "#000000"
-                
-                # Position with X and Y offsets
-                counter_x_center = cx + int(self.counter_x_pos * pw)
-                counter_y_center = cy + int(self.counter_y_pos * ph)
-                
-                if self.counter_rotation == 0:
-                    # No rotation - draw directly
-                    bbox = draw.textbbox((0, 0), sample_text, font=counter_font)
-                    cw = bbox[2] - bbox[0]
-                    ch = bbox[3] - bbox[1]
-                    
-                    counter_x = counter_x_center - cw // 2 - bbox[0]
-                    counter_y = counter_y_center - ch // 2 - bbox[1]
-                    
-                    # Draw number
-                    draw.text((counter_x, counter_y), sample_text, fill=counter_color, font=counter_font)
-                    
-                    # Draw box around counter (fixed orange color for drag handle)
-                    actual_bbox = draw.textbbox((counter_x, counter_y), sample_text, font=counter_font)
-                    draw.rectangle([actual_bbox[0] - 4, actual_bbox[1] - 2, 
-                                   actual_bbox[2] + 4, actual_bbox[3] + 2], outline="#FF9800", width=2)
-                    # Store bbox in canvas coordinates
-                    self.counter_bbox = (
-                        actual_bbox[0] - 4 + self.preview_offset_x,
-                        actual_bbox[1] - 2 + self.preview_offset_y,
-                        actual_bbox[2] + 4 + self.preview_offset_x,
-                        actual_bbox[3] + 2 + self.preview_offset_y
-                    )
-                else:
-                    # Create rotated text
-                    bbox = draw.textbbox((0, 0), sample_text, font=counter_font)
-                    text_w = bbox[2] - bbox[0] + 8
-                    text_h = bbox[3] - bbox[1] + 4
-                    
-                    # Create transparent image for text
-                    txt_img = Image.new('RGBA', (text_w, text_h), (255, 255, 255, 0))
-                    txt_draw = ImageDraw.Draw(txt_img)
-                    txt_draw.text((4 - bbox[0], 2 - bbox[1]), sample_text, fill=counter_color, font=counter_font)
-                    
-                    # Draw box on text image (fixed orange color for drag handle)
-                    txt_draw.rectangle([0, 0, text_w - 1, text_h - 1], outline="#FF9800", width=2)
-                    
-                    # Rotate the text image
-                    rotated = txt_img.rotate(self.counter_rotation, expand=True, resample=Image.BICUBIC)
-                    
-                    # Paste onto ticket
-                    paste_x = counter_x_center - rotated.width // 2
-                    paste_y = counter_y_center - rotated.height // 2
-                    ticket.paste(rotated, (paste_x, paste_y), rotated)
-                    # Store bbox in canvas coordinates
-                    self.counter_bbox = (
-                        paste_x + self.preview_offset_x,
-                        paste_y + self.preview_offset_y,
-                        paste_x + rotated.width + self.preview_offset_x,
-                        paste_y + rotated.height + self.preview_offset_y
-                    )
+                sample_text = self.get_counter_sample_text()
+                counter_color = self.print_color(COUNTER_RED if self.counter_color_var.get() == "Red" else "#000000")
+                key = (sample_text, counter_size, counter_color, self.counter_rotation)
+                self.set_preview_layer("counter", key,
+                                       lambda: self.render_counter_sprite(sample_text, counter_size, counter_color))
+            else:
+                self.preview_layers.pop("counter", None)
             
-            self.preview_photo = ImageTk.PhotoImage(ticket)
             self.preview_canvas.delete("all")
-            self.preview_canvas.create_image((canvas_w - pw)//2, (canvas_h - ph)//2, anchor=tk.NW, image=self.preview_photo)
+            for name in ("background", "title", "name", "counter"):
+                layer = self.preview_layers.get(name)
+                if layer:
+                    self.preview_canvas.create_image(0, 0, anchor=tk.NW, image=layer[1], tags=name)
+            self.preview_canvas.coords("background", self.preview_offset_x, self.preview_offset_y)
+            self.place_preview_sprites()
             
             # Legend
             self.preview_canvas.create_rectangle(10, canvas_h-20, 20, canvas_h-10, fill="#2196F3", outline="#2196F3")
             self.preview_canvas.create_text(24, canvas_h-15, anchor=tk.W, text="Title", fill="#333", font=("Arial", 8))
             
             # Only show Name/Extra legend if we have data to show
-            if self.blanks_mode.get() or self.attendees:
+            if self.blanks_mode.get() or self.attendee_count:
                 self.preview_canvas.create_rectangle(60, canvas_h-20, 70, canvas_h-10, fill="#4CAF50", outline="#4CAF50")
                 legend_text = "Extra" if self.blanks_mode.get() else "Name"
                 self.preview_canvas.create_text(74, canvas_h-15, anchor=tk.W, text=legend_text, fill="#333", font=("Arial", 8))
             
             if self.counter_enabled_var.get():
                 # Position counter legend based on whether Name/Extra is shown
-                counter_x = 110 if (self.blanks_mode.get() or self.attendees) else 60
+                counter_x = 110 if (self.blanks_mode.get() or self.attendee_count) else 60
                 self.preview_canvas.create_rectangle(counter_x, canvas_h-20, counter_x+10, canvas_h-10, fill="#FF9800", outline="#FF9800")
                 self.preview_canvas.create_text(counter_x+14, canvas_h-15, anchor=tk.W, text="Counter", fill="#333", font=("Arial", 8))
             
@@ -1807,6 +1863,161 @@ In Blanks mode:
             print(f"Preview error: {e}")
             traceback.print_exc()
     
+    def set_preview_layer(self, name, key, render):
+        """Keep a cached preview layer, re-rendering it only if key changed
+        
+        render() returns (image, anchor, box): anchor is the pixel placed on the layer's
+        position and box is its drag handle, both in layer coordinates.
+        """
+        layer = self.preview_layers.get(name)
+        if layer is None or layer[0] != key:
+            img, anchor, box = render()
+            self.preview_layers[name] = (key, ImageTk.PhotoImage(img), anchor, box)
+    
+    def place_preview_sprites(self):
+        """Move the title, name and counter sprites to their current positions"""
+        pw, ph = self.preview_ticket_width, self.preview_ticket_height
+        cx = self.preview_offset_x + pw // 2
+        cy = self.preview_offset_y + ph // 2
+        lock = self.center_lock_var.get()
+        offsets = {
+            "title": (0 if lock else int(self.title_x_pos * pw), int(self.title_y_pos * ph)),
+            "name": (0 if lock else int(self.name_x_pos * pw), int(self.name_y_pos * ph)),
+            "counter": (int(self.counter_x_pos * pw), int(self.counter_y_pos * ph)),
+        }
+        for name, (dx, dy) in offsets.items():
+            bbox = None
+            layer = self.preview_layers.get(name)
+            if layer:
+                (ax, ay), (x1, y1, x2, y2) = layer[2], layer[3]
+                left, top = cx + dx - ax, cy + dy - ay
+                self.preview_canvas.coords(name, left, top)
+                # Bounding box in canvas coordinates, used for hit testing
+                bbox = (left + x1, top + y1, left + x2, top + y2)
+            setattr(self, name + "_bbox", bbox)
+    
+    def render_background_layer(self, pw, ph):
+        """Stretch image to fill entire ticket, composite onto white background (matches PDF)"""
+        stretched = self.get_stretched_image(pw, ph)
+        ticket = Image.new('RGB', (pw, ph), '#FFFFFF')
+        if stretched.mode in ('RGBA', 'LA'):
+            ticket.paste(stretched, (0, 0), stretched)  # Use alpha as mask
+        else:
+            ticket.paste(stretched, (0, 0))
+        return ticket, (0, 0), None
+    
+    def render_title_sprite(self, title, size):
+        font = self.get_preview_font(size, self.title_bold_var.get())
+        return self.render_text_sprite([title], font, self.print_color(self.title_color), self.title_outline_var.get(),
+                                       self.title_underline_var.get(), "#2196F3")
+    
+    def render_name_sprite(self, first, last, name_size, max_width, line_gap):
+        bold = self.name_bold_var.get()
+        measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+        
+        # Auto-fit: shrink font if names are too wide (whole pixel steps, down to 6)
+        if self.auto_fit_names_var.get():
+            def width_at(size):
+                test_font = self.get_preview_font(size, bold)
+                first_w = measure.textbbox((0, 0), first, font=test_font)[2] if first else 0
+                last_w = measure.textbbox((0, 0), last, font=test_font)[2] if last else 0
+                return max(first_w, last_w)
+            
+            name_size = fit_font_size(width_at, name_size, max_width, step=1, min_size=6)
+        name_font = self.get_preview_font(name_size, bold)
+        
+        # First name on top, Last name below (or single line in blanks mode)
+        lines = [first] if first and not last else [first, last]
+        return self.render_text_sprite(lines, name_font, self.print_color(self.name_color), self.name_outline_var.get(),
+                                       self.name_underline_var.get(), "#4CAF50", line_gap)
+    
+    def render_text_sprite(self, lines, font, color, outline, underline, box_color, line_gap=0):
+        """Draw centered lines of text and their drag box on a transparent sprite"""
+        measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+        bboxes = [measure.textbbox((0, 0), line, font=font) for line in lines]
+        total_h = sum(b[3] - b[1] for b in bboxes) + line_gap * (len(lines) - 1)
+        
+        # Lay the lines out around (0, 0), each centered horizontally
+        placed = []
+        top = -(total_h // 2)
+        for line, b in zip(lines, bboxes):
+            w, h = b[2] - b[0], b[3] - b[1]
+            placed.append((line, -(w // 2) - b[0], top - b[1]))
+            top += h + line_gap
+        left = min(x + b[0] for (_, x, _), b in zip(placed, bboxes)) - 2
+        right = max(x + b[2] for (_, x, _), b in zip(placed, bboxes)) + 2
+        box_top, box_bottom = -(total_h // 2) - 2, -(total_h // 2) + total_h + 2
+        
+        # Leave room for the outline, underline and box line width
+        margin = 4
+        ox, oy = margin - left, margin - box_top
+        sprite = Image.new('RGBA', (right - left + 2 * margin + 1, box_bottom - box_top + 2 * margin + 1), (255, 255, 255, 0))
+        draw = ImageDraw.Draw(sprite)
+        for line, x, y in placed:
+            self.draw_text_with_outline(draw, (x + ox, y + oy), line, font, color, outline, underline)
+        box = (left + ox, box_top + oy, right + ox, box_bottom + oy)
+        draw.rectangle(box, outline=box_color, width=2)
+        return sprite, (ox, oy), box
+    
+    def render_counter_sprite(self, sample_text, counter_size, counter_color):
+        counter_font = self.get_preview_font(counter_size, bold=True)
+        measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+        bbox = measure.textbbox((0, 0), sample_text, font=counter_font)
+        text_w = bbox[2] - bbox[0] + 8
+        text_h = bbox[3] - bbox[1] + 4
+        
+        if self.counter_rotation == 0:
+            # No rotation - box drawn around the text, centered on the number
+            sprite = Image.new('RGBA', (text_w + 1, text_h + 1), (255, 255, 255, 0))
+            draw = ImageDraw.Draw(sprite)
+            draw.text((4 - bbox[0], 2 - bbox[1]), sample_text, fill=counter_color, font=counter_font)
+            # Draw box around counter (fixed orange color for drag handle)
+            draw.rectangle([0, 0, text_w, text_h], outline="#FF9800", width=2)
+            anchor = (4 + (text_w - 8) // 2, 2 + (text_h - 4) // 2)
+            return sprite, anchor, (0, 0, text_w, text_h)
+        
+        # Create transparent image for text
+        txt_img = Image.new('RGBA', (text_w, text_h), (255, 255, 255, 0))
+        txt_draw = ImageDraw.Draw(txt_img)
+        txt_draw.text((4 - bbox[0], 2 - bbox[1]), sample_text, fill=counter_color, font=counter_font)
+        
+        # Draw box on text image (fixed orange color for drag handle)
+        txt_draw.rectangle([0, 0, text_w - 1, text_h - 1], outline="#FF9800", width=2)
+        
+        # Rotate the text image
+        rotated = txt_img.rotate(self.counter_rotation, expand=True, resample=Image.BICUBIC)
+        return rotated, (rotated.width // 2, rotated.height // 2), (0, 0, rotated.width, rotated.height)
+    
+    def get_counter_sample_text(self):
+        """Largest counter value, as shown in the preview"""
+        if self.blanks_mode.get():
+            # Blanks mode
+            if self.counter_mode_var.get() == "Per Attendee":
+                try:
+                    max_num = max(1, int(self.counter_repeat_var.get()))
+                except ValueError:
+                    max_num = 5
+                return str(max_num)
+            # Sequential
+            try:
+                start_num = max(1, int(self.counter_start_var.get()))
+            except ValueError:
+                start_num = 1
+            pages = int(self.blank_pages_var.get())
+            cols, rows, _, _ = self.calculate_grid()
+            max_num = start_num + (pages * rows * cols) - 1
+            num_digits = len(str(max_num))
+            return str(max_num).zfill(num_digits)
+        
+        # Normal mode with attendees
+        if self.counter_mode_var.get() == "Sequential":
+            max_num = self.attendee_count * int(self.tickets_per_attendee_var.get()) if self.attendee_count else 100
+            # Zero-pad to match max number length
+            num_digits = len(str(max_num))
+            return str(max_num).zfill(num_digits)
+        return str(int(self.tickets_per_attendee_var.get()))
+    
+    @profiled("preview_layout", accumulate=True)
     def update_layout_preview(self):
         try:
             page_w, page_h = self.get_page_dimensions()
@@ -1823,17 +2034,13 @@ In Blanks mode:
             page = Image.new('RGB', (pw, ph), 'white')
             draw = ImageDraw.Draw(page)
             
-            try:
-                font = ImageFont.truetype("arial.ttf", 8)
-            except:
-                font = ImageFont.load_default()
+            font = load_font(LABEL_FONT, 8)
             
             mini = None
             if self.ticket_image and tw > 10 and th > 10:
-                processed_img = self.get_processed_image()
-                stretched = processed_img.resize((tw, th), Image.LANCZOS)
+                stretched = self.get_stretched_image(tw, th)
                 mini = Image.new('RGB', (tw, th), '#FFFFFF')
-                if stretched.mode == 'RGBA':
+                if stretched.mode in ('RGBA', 'LA'):
                     mini.paste(stretched, (0, 0), stretched)
                 else:
                     mini.paste(stretched, (0, 0))
@@ -1919,527 +2126,338 @@ In Blanks mode:
             traceback.print_exc()
     
     def generate_pdf(self):
+        if self.generation:
+            # The button doubles as Cancel while a PDF is being generated
+            self.cancel_generation()
+            return
+        
+        output = self.ask_output_path()
+        if not output:
+            return
+        
+        settings = self.get_settings()
+        if self.blanks_mode.get():
+            renderer = TicketRenderer(settings, self.image_pyramid)
+        else:
+            renderer = TicketRenderer(settings, self.image_pyramid, self.csv_path)
+        self.start_generation(renderer, output, self.blanks_mode.get())
+    
+    def ask_output_path(self):
+        """Check the inputs and ask where to save (None = cancelled)"""
         if self.blanks_mode.get():
             # Blanks mode: only need image
             if not self.image_path:
                 messagebox.showwarning("Missing", "Select an image first.")
-                return
+                return None
         else:
             # Normal mode: need CSV and image
-            if not self.csv_path or not self.image_path or not self.attendees:
+            if not self.csv_path or not self.image_path or not self.attendee_count:
                 messagebox.showwarning("Missing", "Select CSV and image first.")
-                return
+                return None
         
         default_name = "blank_tickets.pdf" if self.blanks_mode.get() else "tickets.pdf"
         output = filedialog.asksaveasfilename(title="Save PDF", defaultextension=".pdf", 
                                                filetypes=[("PDF", "*.pdf")], initialfile=default_name)
+        return output or None
+    
+    def start_generation(self, renderer, output, blanks):
+        """Run the renderer on a worker thread so the window stays responsive"""
+        events = queue.Queue()
+        cancel = threading.Event()
+        renderer.progress = lambda done, total: events.put(("progress", done, total))
+        renderer.cancel = cancel
+        
+        s = renderer.settings
+        cols, rows, att_per_page, _ = s.grid()
+        # workers=0: big runs are sharded across all CPU cores (small runs stay single-process)
+        workers = 0 if self.all_cores_var.get() else 1
+        
+        def run():
+            try:
+                stats = render_output(renderer, output, blanks, workers=workers)
+                events.put(("done", stats))
+            except GenerationCancelled:
+                events.put(("cancelled",))
+            except Exception as e:
+                traceback.print_exc()
+                events.put(("error", e))
+        
+        tickets_per_page = cols * rows if blanks else min(att_per_page * s.tickets_per_attendee, cols * rows)
+        self.generation = {"events": events, "cancel": cancel, "output": output, "blanks": blanks,
+                           "start": time.perf_counter(), "tickets_per_page": tickets_per_page}
+        
+        self.generate_btn.configure(text="CANCEL")
+        self.progress_bar.configure(value=0)
+        self.progress_bar.pack(pady=(6, 0), before=self.status_label)
+        self.status_label.configure(text="Generating PDF...", foreground="#17a2b8")
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(GENERATION_POLL_MS, self.poll_generation)
+    
+    def cancel_generation(self):
+        """Ask the running generation to stop; it ends at the next page without writing the PDF"""
+        self.generation["cancel"].set()
+        self.generate_btn.configure(state="disabled")
+        self.status_label.configure(text="Cancelling...", foreground="#17a2b8")
+    
+    def poll_generation(self):
+        """Pick up progress from the generation thread (Tk widgets are only touched here)"""
+        gen = self.generation
+        progress = None
+        while True:
+            try:
+                event = gen["events"].get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "progress":
+                progress = event[1:]
+            else:
+                self.finish_generation(event)
+                return
+        
+        if progress and not gen["cancel"].is_set():
+            done, total = progress
+            elapsed = time.perf_counter() - gen["start"]
+            rate = done * gen["tickets_per_page"] / elapsed if elapsed > 0 else 0
+            eta = elapsed / done * (total - done)
+            self.progress_bar.configure(value=100 * done / total)
+            self.status_label.configure(
+                text=f"Page {done}/{total}  |  {rate:.0f} tickets/s  |  ETA {format_duration(eta)}",
+                foreground="#17a2b8")
+        self.root.after(GENERATION_POLL_MS, self.poll_generation)
+    
+    def finish_generation(self, event):
+        output, blanks = self.generation["output"], self.generation["blanks"]
+        self.generation = None
+        self.progress_bar.pack_forget()
+        self.generate_btn.configure(text="GENERATE PDF", state="normal")
+        
+        if event[0] == "done":
+            stats = event[1]
+            total_tickets, pages = stats.counters.get("tickets", 0), stats.counters.get("pages", 0)
+            kind = "blank tickets" if blanks else "tickets"
+            self.status_label.configure(text=f"✓ Created {total_tickets} {kind} on {pages} pages!", foreground="#28a745")
+            # Counted while drawing, so checking doesn't mean reading the whole CSV on the Tk thread
+            small = stats.counters.get("small_names", 0)
+            note = (f"\n\n{small} name(s) were too long to fit above {MIN_READABLE_PT}pt and were "
+                    f"printed smaller." if small else "")
+            messagebox.showinfo("Success", f"Created {total_tickets} {kind}!\n{pages} pages\n\nSaved to:\n{output}"
+                                           f"{note}\n\n{stats.summary()}")
+        elif event[0] == "cancelled":
+            # Nothing is written until the last page is done, so there is no partial file
+            self.status_label.configure(text="Generation cancelled", foreground="gray")
+        else:
+            self.status_label.configure(text="Error creating PDF", foreground="#dc3545")
+            messagebox.showerror("Error", f"Could not create PDF:\n{event[1]}")
+    
+    def enqueue_job(self):
+        """Queue a generation with the current files and settings (runs alongside other jobs)"""
+        output = self.ask_output_path()
         if not output:
             return
         
-        self.status_label.configure(text="Generating PDF...", foreground="#17a2b8")
-        self.root.update()
+        settings = self.get_settings()
+        blanks = self.blanks_mode.get()
+        source = os.path.basename(self.image_path if blanks else self.csv_path)
+        name = f"{'Blanks - ' if blanks else ''}{source} ({settings.orientation})"
+        # The current pyramid is shared, so jobs with the same image reuse its processed copies
+        job = GenerationJob(settings, self.image_pyramid, output, self.csv_path, blanks, name=name)
         
+        if self.job_queue is None:
+            self.job_queue = JobQueue()
         try:
-            if self.blanks_mode.get():
-                self.create_blanks_pdf(output)
-                pages = int(self.blank_pages_var.get())
-                cols, rows, _, _ = self.calculate_grid()
-                total_tickets = cols * rows * pages
-                self.status_label.configure(text=f"✓ Created {total_tickets} blank tickets on {pages} pages!", foreground="#28a745")
-                messagebox.showinfo("Success", f"Created {total_tickets} blank tickets!\n{pages} pages\n\nSaved to:\n{output}")
-            else:
-                self.create_pdf(output)
-                tpa = int(self.tickets_per_attendee_var.get())
-                total_pages = self.calculate_total_pages()
-                self.status_label.configure(text=f"✓ Created {len(self.attendees)*tpa} tickets on {total_pages} pages!", foreground="#28a745")
-                messagebox.showinfo("Success", f"Created {len(self.attendees)*tpa} tickets!\n{total_pages} pages\n\nSaved to:\n{output}")
-        except Exception as e:
-            self.status_label.configure(text="Error creating PDF", foreground="#dc3545")
-            messagebox.showerror("Error", f"Could not create PDF:\n{e}")
-            traceback.print_exc()
-            
-    def create_pdf(self, output):
-        page_w, page_h = self.get_page_dimensions()
-        ticket_w, ticket_h = self.get_ticket_dimensions()
-        cols, rows, att_per_page, rows_per_att = self.calculate_grid()
-        tpa = int(self.tickets_per_attendee_var.get())
-        
-        gw, gh = cols * ticket_w, rows * ticket_h
+            self.job_queue.submit(job)
+        except ValueError as e:
+            messagebox.showwarning("Queue", str(e))
+            return
         
-        if self.align_top_left_var.get():
-            ox, oy = 0, 0
-        else:
-            ox, oy = (page_w - gw) / 2, (page_h - gh) / 2
-        
-        # Prepare image - stretch to fill exact dimensions, composite onto white
-        dpi = 3
-        iw, ih = int(ticket_w * dpi), int(ticket_h * dpi)
-        processed_img = self.get_processed_image()
-        stretched = processed_img.resize((iw, ih), Image.LANCZOS)
-        ticket_img = Image.new('RGB', (iw, ih), '#FFFFFF')
-        if stretched.mode == 'RGBA':
-            ticket_img.paste(stretched, (0, 0), stretched)
+        self.show_jobs()
+        if not self.jobs_polling:
+            self.jobs_polling = True
+            self.poll_jobs()
+    
+    def poll_jobs(self):
+        """Refresh the queue display until every job has finished"""
+        self.refresh_jobs()
+        if self.job_queue.active():
+            self.root.after(GENERATION_POLL_MS, self.poll_jobs)
         else:
-            ticket_img.paste(stretched, (0, 0))
+            self.jobs_polling = False
+    
+    def show_jobs(self):
+        """Show the job queue window (closing it doesn't stop the jobs)"""
+        if self.jobs_window is not None:
+            self.jobs_window.lift()
+            self.refresh_jobs()
+            return
         
-        temp = os.path.join(os.path.dirname(output), "_temp.png")
-        ticket_img.save(temp, "PNG")
-        img_reader = ImageReader(temp)
+        self.jobs_window = tk.Toplevel(self.root)
+        self.jobs_window.title("Job Queue")
+        self.jobs_window.transient(self.root)
         
-        title_rgb = self.hex_to_rgb(self.title_color)
-        name_rgb = self.hex_to_rgb(self.name_color)
+        # Window size and position
+        win_w, win_h = 640, 300
+        x = self.root.winfo_x() + 50
+        y = self.root.winfo_y() + 50
+        self.jobs_window.geometry(f"{win_w}x{win_h}+{x}+{y}")
         
-        c = canvas.Canvas(output, pagesize=(page_w, page_h))
+        main_frame = ttk.Frame(self.jobs_window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
         
-        def draw_ticket(x, y, first, last, counter_num=None):
-            """Helper to draw a single ticket at position x, y"""
-            c.drawImage(img_reader, x, y, width=ticket_w, height=ticket_h, mask='auto')
-            
-            cx, cy = x + ticket_w/2, y + ticket_h/2
-            size_factor = min(ticket_w / (3*inch), ticket_h / (1.75*inch))
-            
-            # Calculate X positions based on center lock
-            title_x = cx + (0 if self.center_lock_var.get() else self.title_x_pos * ticket_w)
-            name_x = cx + (0 if self.center_lock_var.get() else self.name_x_pos * ticket_w)
-            
-            # Title
-            title = self.title_var.get().strip()
-            if title:
-                title_size = max(6, int(int(self.title_font_size_var.get()) * size_factor * 1.8))
-                font_name = "Helvetica-Bold" if self.title_bold_var.get() else "Helvetica"
-                c.setFont(font_name, title_size)
-                
-                # PDF Y is bottom-up, title_y_pos negative = above center = higher Y in PDF
-                title_y = cy - (self.title_y_pos * ticket_h) - title_size * 0.35
-                
-                if self.title_outline_var.get():
-                    c.setFillColorRGB(1, 1, 1)
-                    for dx in [-1, 0, 1]:
-                        for dy in [-1, 0, 1]:
-                            if dx or dy:
-                                c.drawCentredString(title_x + dx, title_y + dy, title)
-                
-                c.setFillColorRGB(title_rgb[0]/255, title_rgb[1]/255, title_rgb[2]/255)
-                c.drawCentredString(title_x, title_y, title)
-                
-                # Title underline
-                if self.title_underline_var.get():
-                    title_width = c.stringWidth(title, font_name, title_size)
-                    c.setStrokeColorRGB(title_rgb[0]/255, title_rgb[1]/255, title_rgb[2]/255)
-                    c.setLineWidth(1)
-                    c.line(title_x - title_width/2, title_y - 2, title_x + title_width/2, title_y - 2)
-            
-            # Name - First above Last
-            name_size = max(6, int(int(self.name_font_size_var.get()) * size_factor * 1.8))
-            font_name = "Helvetica-Bold" if self.name_bold_var.get() else "Helvetica"
-            
-            # Auto-fit: shrink font if names are too wide
-            if self.auto_fit_names_var.get() and (first or last):
-                max_width = ticket_w * 0.85  # 85% of ticket width
-                while name_size > 4:
-                    first_w = c.stringWidth(first, font_name, name_size) if first else 0
-                    last_w = c.stringWidth(last, font_name, name_size) if last else 0
-                    if max(first_w, last_w) <= max_width:
-                        break
-                    name_size -= 0.5
-            
-            c.setFont(font_name, name_size)
-            
-            # PDF Y is bottom-up, name_y_pos positive = below center in preview = lower Y in PDF
-            name_y_center = cy - (self.name_y_pos * ticket_h)
-            
-            if first and not last:
-                # Single line mode - center the name vertically
-                first_y = name_y_center - name_size * 0.35
-                
-                if self.name_outline_var.get():
-                    c.setFillColorRGB(1, 1, 1)
-                    for dx in [-1, 0, 1]:
-                        for dy in [-1, 0, 1]:
-                            if dx or dy:
-                                c.drawCentredString(name_x + dx, first_y + dy, first)
-                
-                c.setFillColorRGB(name_rgb[0]/255, name_rgb[1]/255, name_rgb[2]/255)
-                c.drawCentredString(name_x, first_y, first)
-                
-                if self.name_underline_var.get():
-                    c.setStrokeColorRGB(name_rgb[0]/255, name_rgb[1]/255, name_rgb[2]/255)
-                    c.setLineWidth(1)
-                    first_width = c.stringWidth(first, font_name, name_size)
-                    c.line(name_x - first_width/2, first_y - 2, name_x + first_width/2, first_y - 2)
-            else:
-                # Two line mode - first name above, last name below
-                line_gap = name_size * 0.15
-                first_y = name_y_center + line_gap / 2 + name_size * 0.15
-                last_y = name_y_center - line_gap / 2 - name_size * 0.65
-                
-                if self.name_outline_var.get():
-                    c.setFillColorRGB(1, 1, 1)
-                    for dx in [-1, 0, 1]:
-                        for dy in [-1, 0, 1]:
-                            if dx or dy:
-                                c.drawCentredString(name_x + dx, first_y + dy, first)
-                                c.drawCentredString(name_x + dx, last_y + dy, last)
-                
-                c.setFillColorRGB(name_rgb[0]/255, name_rgb[1]/255, name_rgb[2]/255)
-                c.drawCentredString(name_x, first_y, first)
-                c.drawCentredString(name_x, last_y, last)
-                
-                if self.name_underline_var.get():
-                    c.setStrokeColorRGB(name_rgb[0]/255, name_rgb[1]/255, name_rgb[2]/255)
-                    c.setLineWidth(1)
-                    first_width = c.stringWidth(first, font_name, name_size)
-                    last_width = c.stringWidth(last, font_name, name_size)
-                    c.line(name_x - first_width/2, first_y - 2, name_x + first_width/2, first_y - 2)
-                    c.line(name_x - last_width/2, last_y - 2, name_x + last_width/2, last_y - 2)
-            
-            # Counter number
-            if counter_num is not None and self.counter_enabled_var.get():
-                counter_size = max(6, int(int(self.counter_size_var.get()) * size_factor * 1.8))
-                c.setFont("Helvetica-Bold", counter_size)
-                
-                # Set counter color
-                if self.counter_color_var.get() == "Red":
-                    c.setFillColorRGB(0.769, 0.118, 0.227)  # #C41E3A
-                else:
-                    c.setFillColorRGB(0, 0, 0)  # Black
-                
-                # Calculate counter position with X and Y offsets
-                counter_x = cx + (self.counter_x_pos * ticket_w)
-                counter_y = cy - (self.counter_y_pos * ticket_h) - counter_size * 0.35
-                
-                if self.counter_rotation == 0:
-                    c.drawCentredString(counter_x, counter_y, str(counter_num))
-                else:
-                    # Save state, rotate, draw, restore
-                    c.saveState()
-                    c.translate(counter_x, counter_y + counter_size * 0.35)
-                    c.rotate(self.counter_rotation)
-                    c.drawCentredString(0, -counter_size * 0.35, str(counter_num))
-                    c.restoreState()
-        
-        def draw_cutting_guides():
-            """Draw dotted cutting lines between tickets"""
-            if not self.cutting_guides_var.get():
-                return
-            
-            c.setStrokeColorRGB(0.5, 0.5, 0.5)  # Gray color
-            c.setLineWidth(0.5)
-            c.setDash(3, 3)  # Dotted line pattern
-            
-            # Vertical lines between columns
-            for col in range(cols + 1):
-                x = ox + col * ticket_w
-                y_start = page_h - oy - rows * ticket_h
-                y_end = page_h - oy
-                c.line(x, y_start, x, y_end)
-            
-            # Horizontal lines between rows
-            for row in range(rows + 1):
-                y = page_h - oy - row * ticket_h
-                x_start = ox
-                x_end = ox + cols * ticket_w
-                c.line(x_start, y, x_end, y)
-            
-            c.setDash()  # Reset to solid line
-        
-        # Calculate max sequential number for zero-padding
-        max_sequential = len(self.attendees) * tpa
-        num_digits = len(str(max_sequential))
-        
-        if self.batch_mode_var.get():
-            # Batch mode ON: group tickets by attendee
-            idx = 0
-            sequential_counter = 0  # For sequential mode
-            while idx < len(self.attendees):
-                for page_att in range(att_per_page):
-                    if idx >= len(self.attendees):
-                        break
-                    
-                    first, last = self.parse_name(self.attendees[idx])
-                    start_row = page_att * rows_per_att
-                    count = 0
-                    
-                    for row_off in range(rows_per_att):
-                        if count >= tpa:
-                            break
-                        for col in range(cols):
-                            if count >= tpa:
-                                break
-                            
-                            row = start_row + row_off
-                            x = ox + col * ticket_w
-                            y = page_h - oy - (row + 1) * ticket_h
-                            
-                            # Determine counter number with zero-padding for sequential
-                            if self.counter_mode_var.get() == "Per Attendee":
-                                counter_num = str(count + 1)
-                            else:  # Sequential
-                                sequential_counter += 1
-                                counter_num = str(sequential_counter).zfill(num_digits)
-                            
-                            draw_ticket(x, y, first, last, counter_num)
-                            count += 1
-                    
-                    idx += 1
-                
-                draw_cutting_guides()
-                if idx < len(self.attendees):
-                    c.showPage()
-        else:
-            # Batch mode OFF: fill pages sequentially
-            idx = 0  # Current attendee index
-            ticket_for_attendee = 0  # How many tickets placed for current attendee
-            sequential_counter = 0  # For sequential mode
-            
-            while idx < len(self.attendees):
-                # Fill one page
-                tickets_on_page = 0
-                max_tickets_on_page = att_per_page * tpa
-                
-                for row in range(rows):
-                    for col in range(cols):
-                        if tickets_on_page >= max_tickets_on_page or idx >= len(self.attendees):
-                            break
-                        
-                        first, last = self.parse_name(self.attendees[idx])
-                        x = ox + col * ticket_w
-                        y = page_h - oy - (row + 1) * ticket_h
-                        
-                        # Determine counter number with zero-padding for sequential
-                        if self.counter_mode_var.get() == "Per Attendee":
-                            counter_num = str(ticket_for_attendee + 1)
-                        else:  # Sequential
-                            sequential_counter += 1
-                            counter_num = str(sequential_counter).zfill(num_digits)
-                        
-                        draw_ticket(x, y, first, last, counter_num)
-                        
-                        ticket_for_attendee += 1
-                        tickets_on_page += 1
-                        
-                        if ticket_for_attendee >= tpa:
-                            idx += 1
-                            ticket_for_attendee = 0
-                    
-                    if tickets_on_page >= max_tickets_on_page or idx >= len(self.attendees):
-                        break
-                
-                draw_cutting_guides()
-                if idx < len(self.attendees):
-                    c.showPage()
+        columns = (("job", "Job", 170), ("status", "Status", 80), ("progress", "Progress", 100),
+                   ("output", "Output", 270))
+        self.jobs_tree = ttk.Treeview(main_frame, columns=[c[0] for c in columns], show="headings")
+        for col, heading, width in columns:
+            self.jobs_tree.heading(col, text=heading)
+            self.jobs_tree.column(col, width=width, anchor=tk.W)
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.jobs_tree.yview)
+        self.jobs_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.jobs_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        button_row = ttk.Frame(self.jobs_window)
+        button_row.pack(pady=(0, 10))
+        ttk.Button(button_row, text="Cancel Selected", command=self.cancel_selected_jobs,
+                   bootstyle="danger-outline").pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_row, text="Clear Finished", command=self.clear_finished_jobs,
+                   bootstyle="secondary-outline").pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_row, text="Close", command=self.close_jobs,
+                   bootstyle="secondary").pack(side=tk.LEFT, padx=5)
+        
+        self.jobs_window.protocol("WM_DELETE_WINDOW", self.close_jobs)
+        self.refresh_jobs()
+    
+    def close_jobs(self):
+        if self.jobs_window:
+            self.jobs_window.destroy()
+            self.jobs_window = None
+    
+    def refresh_jobs(self):
+        """Update the Queue button count and the rows of the queue window"""
+        jobs = {str(id(job)): job for job in (self.job_queue.jobs if self.job_queue else [])}
+        active = sum(1 for job in jobs.values() if not job.finished)
+        self.jobs_btn.configure(text=f"Queue ({active})" if active else "Queue")
+        if self.jobs_window is None:
+            return
         
-        c.save()
+        # Rows are updated in place so the selection survives each refresh
+        for iid in self.jobs_tree.get_children():
+            if iid not in jobs:
+                self.jobs_tree.delete(iid)
+        for iid, job in jobs.items():
+            if job.status == JOB_DONE:
+                progress = f"{job.tickets} tickets"
+                small = job.stats.counters.get("small_names", 0) if job.stats else 0
+                if small:
+                    progress += f", {small} small names"
+            elif job.total_pages:
+                progress = f"Page {job.pages_done}/{job.total_pages}"
+            else:
+                progress = ""
+            values = (job.name, job.status, progress, f"Error: {job.error}" if job.error else job.output)
+            if self.jobs_tree.exists(iid):
+                self.jobs_tree.item(iid, values=values)
+            else:
+                self.jobs_tree.insert("", tk.END, iid=iid, values=values)
+    
+    def cancel_selected_jobs(self):
+        selected = set(self.jobs_tree.selection())
+        for job in self.job_queue.jobs if self.job_queue else []:
+            if str(id(job)) in selected:
+                self.job_queue.cancel(job)
+        self.refresh_jobs()
+    
+    def clear_finished_jobs(self):
+        if self.job_queue:
+            self.job_queue.clear_finished()
+        self.refresh_jobs()
+    
+    def save_job(self):
+        """Save the files, mode and settings as a job spec (replayable with ticket_engine.py --jobs)"""
+        path = filedialog.asksaveasfilename(title="Save Job", defaultextension=".json",
+                                            filetypes=[("Ticket job", "*.json")], initialfile="ticket_job.json")
+        if not path:
+            return
+        blanks = bool(self.blanks_mode.get())
         try:
-            os.remove(temp)
-        except:
-            pass
+            spec = JobSpec(image=os.path.abspath(self.image_path),
+                           csv=None if blanks else os.path.abspath(self.csv_path),
+                           blanks=blanks, image_rotation=self.image_rotation, settings=self.get_settings())
+            save_job_specs(path, [spec])
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not save job:\n{e}")
+            return
+        self.status_label.configure(text=f"✓ Saved job {os.path.basename(path)}", foreground="#28a745")
     
-    def create_blanks_pdf(self, output):
-        """Generate PDF with blank tickets (no names, just extra text if provided)"""
-        page_w, page_h = self.get_page_dimensions()
-        ticket_w, ticket_h = self.get_ticket_dimensions()
-        cols, rows, _, _ = self.calculate_grid()
-        pages = int(self.blank_pages_var.get())
-        
-        gw, gh = cols * ticket_w, rows * ticket_h
-        
-        if self.align_top_left_var.get():
-            ox, oy = 0, 0
-        else:
-            ox, oy = (page_w - gw) / 2, (page_h - gh) / 2
-        
-        # Prepare image
-        dpi = 3
-        iw, ih = int(ticket_w * dpi), int(ticket_h * dpi)
-        processed_img = self.get_processed_image()
-        stretched = processed_img.resize((iw, ih), Image.LANCZOS)
-        final_img = Image.new('RGB', (iw, ih), '#FFFFFF')
-        if stretched.mode == 'RGBA':
-            final_img.paste(stretched, (0, 0), stretched)
-        else:
-            final_img.paste(stretched, (0, 0))
-        
-        temp = output + ".tmp.png"
-        final_img.save(temp, dpi=(72*dpi, 72*dpi))
-        img_reader = ImageReader(temp)
-        
-        c = canvas.Canvas(output, pagesize=(page_w, page_h))
+    def load_job(self):
+        """Restore files, mode and settings from a job spec (the first job of a batch file)"""
+        path = filedialog.askopenfilename(title="Load Job", filetypes=[("Ticket job", "*.json"), ("All", "*.*")])
+        if not path:
+            return
+        try:
+            spec = load_job_specs(path)[0]
+            self.load_ticket_image(spec.image)
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            messagebox.showerror("Error", f"Could not load job:\n{e}")
+            return
         
-        title_rgb = self.hex_to_rgb(self.title_color)
-        extra_rgb = self.hex_to_rgb(self.name_color)  # Extra text uses "name" color settings
+        self.image_path = spec.image
+        self.img_label.configure(text=os.path.basename(spec.image)[:20], foreground="")
+        for _ in range(spec.image_rotation // 90):
+            self.rotate_ticket()
         
-        extra_text = self.extra_text_var.get().strip()
+        if bool(self.blanks_mode.get()) != spec.blanks:
+            self.toggle_blanks_mode()
+        if spec.csv:
+            self.csv_path = spec.csv
+            self.load_attendees(spec.csv)
+            self.csv_btn.configure(text="Remove CSV", bootstyle="danger-outline")
+            self.csv_label.configure(text=f"{os.path.basename(spec.csv)[:15]} ({self.attendee_count} attendees)", foreground="")
         
-        def draw_blank_ticket(x, y, counter_num=None):
-            """Draw a single blank ticket at position x, y"""
-            c.drawImage(img_reader, x, y, width=ticket_w, height=ticket_h, mask='auto')
-            
-            cx, cy = x + ticket_w/2, y + ticket_h/2
-            size_factor = min(ticket_w / (3*inch), ticket_h / (1.75*inch))
-            
-            # Calculate X positions based on center lock
-            title_x = cx + (0 if self.center_lock_var.get() else self.title_x_pos * ticket_w)
-            extra_x = cx + (0 if self.center_lock_var.get() else self.name_x_pos * ticket_w)
-            
-            # Title
-            title = self.title_var.get().strip()
-            if title:
-                title_size = max(6, int(int(self.title_font_size_var.get()) * size_factor * 1.8))
-                font_name = "Helvetica-Bold" if self.title_bold_var.get() else "Helvetica"
-                c.setFont(font_name, title_size)
-                
-                title_y = cy - (self.title_y_pos * ticket_h) - title_size * 0.35
-                
-                if self.title_outline_var.get():
-                    c.setFillColorRGB(1, 1, 1)
-                    for dx in [-1, 0, 1]:
-                        for dy in [-1, 0, 1]:
-                            if dx or dy:
-                                c.drawCentredString(title_x + dx, title_y + dy, title)
-                
-                c.setFillColorRGB(title_rgb[0]/255, title_rgb[1]/255, title_rgb[2]/255)
-                c.drawCentredString(title_x, title_y, title)
-                
-                if self.title_underline_var.get():
-                    title_width = c.stringWidth(title, font_name, title_size)
-                    c.setStrokeColorRGB(title_rgb[0]/255, title_rgb[1]/255, title_rgb[2]/255)
-                    c.setLineWidth(1)
-                    c.line(title_x - title_width/2, title_y - 2, title_x + title_width/2, title_y - 2)
-            
-            # Extra text (single line, uses "name/extra" settings)
-            if extra_text:
-                extra_size = max(6, int(int(self.name_font_size_var.get()) * size_factor * 1.8))
-                font_name = "Helvetica-Bold" if self.name_bold_var.get() else "Helvetica"
-                
-                # Auto-fit: shrink font if extra text is too wide
-                if self.auto_fit_names_var.get():
-                    max_width = ticket_w * 0.85  # 85% of ticket width
-                    while extra_size > 4:
-                        text_w = c.stringWidth(extra_text, font_name, extra_size)
-                        if text_w <= max_width:
-                            break
-                        extra_size -= 0.5
-                
-                c.setFont(font_name, extra_size)
-                
-                extra_y = cy - (self.name_y_pos * ticket_h) - extra_size * 0.35
-                
-                if self.name_outline_var.get():
-                    c.setFillColorRGB(1, 1, 1)
-                    for dx in [-1, 0, 1]:
-                        for dy in [-1, 0, 1]:
-                            if dx or dy:
-                                c.drawCentredString(extra_x + dx, extra_y + dy, extra_text)
-                
-                c.setFillColorRGB(extra_rgb[0]/255, extra_rgb[1]/255, extra_rgb[2]/255)
-                c.drawCentredString(extra_x, extra_y, extra_text)
-                
-                if self.name_underline_var.get():
-                    extra_width = c.stringWidth(extra_text, font_name, extra_size)
-                    c.setStrokeColorRGB(extra_rgb[0]/255, extra_rgb[1]/255, extra_rgb[2]/255)
-                    c.setLineWidth(1)
-                    c.line(extra_x - extra_width/2, extra_y - 2, extra_x + extra_width/2, extra_y - 2)
-            
-            # Counter number
-            if counter_num is not None and self.counter_enabled_var.get():
-                counter_size = max(6, int(int(self.counter_size_var.get()) * size_factor * 1.8))
-                c.setFont("Helvetica-Bold", counter_size)
-                
-                # Set counter color
-                if self.counter_color_var.get() == "Red":
-                    c.setFillColorRGB(0.769, 0.118, 0.227)  # #C41E3A
-                else:
-                    c.setFillColorRGB(0, 0, 0)  # Black
-                
-                # Calculate counter position with X and Y offsets
-                counter_x = cx + (self.counter_x_pos * ticket_w)
-                counter_y = cy - (self.counter_y_pos * ticket_h) - counter_size * 0.35
-                
-                if self.counter_rotation == 0:
-                    c.drawCentredString(counter_x, counter_y, str(counter_num))
-                else:
-                    # Save state, rotate, draw, restore
-                    c.saveState()
-                    c.translate(counter_x, counter_y + counter_size * 0.35)
-                    c.rotate(self.counter_rotation)
-                    c.drawCentredString(0, -counter_size * 0.35, str(counter_num))
-                    c.restoreState()
-        
-        def draw_cutting_guides():
-            """Draw dotted cutting lines between tickets"""
-            if not self.cutting_guides_var.get():
+        # Settings last: loading and rotating the image auto-fits the ticket size
+        self.apply_settings(spec.settings)
+        self.update_preview()
+    
+    def toggle_profiling(self):
+        """Switch profiling (cProfile + stack sampling) on or off; previews are saved on switching off"""
+        if not profiling_enabled():
+            set_profiling(PROFILE_MODES)
+            self.status_label.configure(text="Profiling on (Ctrl+Shift+P to stop and save)", foreground="#17a2b8")
+            return
+        paths = set_profiling(None)
+        self.status_label.configure(text="Profiling off", foreground="gray")
+        messagebox.showinfo("Profiling", f"Profiles are saved in:\n{profile_dir()}\n\n"
+                                         f"{len(paths)} preview profile file(s) written now; each PDF "
+                                         f"generation was saved when it finished.")
+    
+    def toggle_diagnostics(self):
+        """Show or hide the render-time overlay, starting or stopping the stall watchdog with it"""
+        self.diagnostics = not self.diagnostics
+        if self.diagnostics:
+            self.watchdog.start()
+            self.status_label.configure(text=f"Diagnostics on, UI stalls are logged to {profile_dir()}",
+                                        foreground="#17a2b8")
+        else:
+            self.watchdog.stop()
+            self.status_label.configure(text="Diagnostics off", foreground="gray")
+        self.draw_diagnostics()
+    
+    def on_close(self):
+        """Quit, cancelling any queued jobs (their worker threads would keep the app alive)"""
+        if self.job_queue and self.job_queue.active():
+            if not messagebox.askyesno("Jobs Running", "Queued jobs are still running.\n\nCancel them and quit?"):
                 return
-            
-            c.setStrokeColorRGB(0.5, 0.5, 0.5)  # Gray color
-            c.setLineWidth(0.5)
-            c.setDash(3, 3)  # Dotted line pattern
-            
-            # Vertical lines between columns
-            for col in range(cols + 1):
-                x = ox + col * ticket_w
-                y_start = page_h - oy - rows * ticket_h
-                y_end = page_h - oy
-                c.line(x, y_start, x, y_end)
-            
-            # Horizontal lines between rows
-            for row in range(rows + 1):
-                y = page_h - oy - row * ticket_h
-                x_start = ox
-                x_end = ox + cols * ticket_w
-                c.line(x_start, y, x_end, y)
-            
-            c.setDash()  # Reset to solid line
-        
-        # Get counter settings for blanks mode
-        if self.counter_mode_var.get() == "Per Attendee":
-            # Cycle 1 to repeat_count
-            try:
-                repeat_count = max(1, int(self.counter_repeat_var.get()))
-            except ValueError:
-                repeat_count = 5
-            num_digits = len(str(repeat_count))
-        else:  # Sequential
-            # Start from start_num
-            try:
-                start_num = max(1, int(self.counter_start_var.get()))
-            except ValueError:
-                start_num = 1
-            max_sequential = start_num + (pages * rows * cols) - 1
-            num_digits = len(str(max_sequential))
-        
-        # Generate all pages
-        sequential_counter = 0
-        for page in range(pages):
-            if page > 0:
-                c.showPage()
-            
-            for row in range(rows):
-                for col in range(cols):
-                    x = ox + col * ticket_w
-                    y = page_h - oy - (row + 1) * ticket_h
-                    sequential_counter += 1
-                    
-                    if self.counter_mode_var.get() == "Per Attendee":
-                        # Cycle 1 to repeat_count
-                        counter_num = ((sequential_counter - 1) % repeat_count) + 1
-                        counter_str = str(counter_num)
-                    else:  # Sequential
-                        counter_num = start_num + sequential_counter - 1
-                        counter_str = str(counter_num).zfill(num_digits)
-                    
-                    draw_blank_ticket(x, y, counter_str)
-            
-            draw_cutting_guides()
-        
-        c.save()
-        try:
-            os.remove(temp)
-        except:
-            pass
+            self.job_queue.shutdown()
+        if self.generation:
+            self.generation["cancel"].set()
+        self.watchdog.stop()
+        flush_profiles()
+        self.root.destroy()
 
 
 def main():
+    # Needed for the PDF worker processes in a PyInstaller build
+    multiprocessing.freeze_support()
+    
     # Set Windows taskbar icon (must be before creating window)
     try:
         import ctypes